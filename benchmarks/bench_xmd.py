@@ -0,0 +1,95 @@
+"""Micro-benchmark of macro resolution and character escapes in xmd, against their previous implementations.
+
+Run from repository root: python benchmarks/bench_xmd.py [--number N]
+
+Previous implementations are kept below as they were: macros were resolved by re-running a regex over whole text 
+until no innermost call was left, and escapes were done by a str.replace pass per character. Outputs of both are 
+checked to be same before timing. Times of macro-heavy corpora are mostly spent in called functions themselves.
+"""
+import re, sys, timeit, argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1])) # run without installing
+
+from ipyslides.xmd import XMarkdown, char_esc, error
+
+
+# ---- previous implementations ----
+OLD_MACRO_RE = re.compile(
+    r"(?<![\\\`])"
+    r"\[([a-zA-Z_]\w*)(!{1,2})(?![!])\s*"
+    r"((?:(?!\[[a-zA-Z_]\w*!)[\s\S])*?)"
+    r"\s*/\]",
+    flags = re.DOTALL | re.MULTILINE
+)
+
+def old_sub_macros(parser, text):
+    depth = 0
+    while OLD_MACRO_RE.search(text):
+        depth += 1
+        text = OLD_MACRO_RE.sub(parser.repl_py_func, text)
+        if depth > 16:
+            return parser._handle_var(error('RecursionError', f"Too many nested macros (> 16) in '{text}'"))
+    return text
+
+def old_escape(text):
+    for ch in char_esc._chars:
+        text = text.replace(rf"\{ch}", f"ESC-{ord(ch):03}-CHR")
+    return text
+
+def old_restore(text, ascii_backtick=False):
+    for ch in char_esc._chars:
+        repl = r"&#96;" if ch == '`' and not ascii_backtick else ch
+        text = text.replace(f"ESC-{ord(ch):03}-CHR", repl)
+    return text
+
+
+# ---- corpus ----
+def corpus(lines = 20):
+    "Markdown chunks like in slides: plain text, flat and nested macros, escaped characters."
+    plain = "\n".join(f"Line {i} of plain text with **bold**, `code` and a [link](https://example.com)." for i in range(lines))
+    flat = "\n".join(f"Item {i}: [b! bold /] and [i! italic /] with [span! text .. style='color:red' /]" for i in range(lines))
+    nested = "\n".join(f"[div! [span! [b! [i! deep {i} /] /] /] .. style='padding:4px' /]" for i in range(lines))
+    escaped = "\n".join(rf"Escaped \@cite \%{{var}} \[b! not a call /\] path\/to\/file, 5 \+ 3 \- 1 \| x" for i in range(lines))
+    return {'plain': plain, 'flat': flat, 'nested': nested, 'escaped': escaped}
+
+
+def resolved(parser, func):
+    "Output of func with private variable names replaced by their values, which differ in numbering between runs."
+    parser._vars.clear()
+    out = func()
+    while (keys := [k for k in parser._vars if k in out]):
+        for k in keys:
+            out = out.replace(k, parser._vars[k])
+    parser._vars.clear()
+    return out
+
+
+def bench(number):
+    parser = XMarkdown()
+    rows = []
+    with parser.active_parser():
+        for name, text in corpus().items():
+            new = lambda: parser._sub_macros(text)
+            old = lambda: old_sub_macros(parser, text)
+            if resolved(parser, new) != resolved(parser, old):
+                raise AssertionError(f"_sub_macros output differs from previous implementation on {name!r} corpus")
+            rows.append((f'_sub_macros, {name}', timeit.timeit(old, number = number), timeit.timeit(new, number = number)))
+            parser._vars.clear()
+    
+    for name, text in corpus().items():
+        if char_esc.escape(text) != old_escape(text) or char_esc.restore(old_escape(text)) != old_restore(old_escape(text)):
+            raise AssertionError(f"char_esc output differs from previous implementation on {name!r} corpus")
+        esc = old_escape(text)
+        rows.append((f'char_esc.escape, {name}', timeit.timeit(lambda: old_escape(text), number = number), timeit.timeit(lambda: char_esc.escape(text), number = number)))
+        rows.append((f'char_esc.restore, {name}', timeit.timeit(lambda: old_restore(esc), number = number), timeit.timeit(lambda: char_esc.restore(esc), number = number)))
+    return rows
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser(description = __doc__.splitlines()[0])
+    ap.add_argument('--number', type = int, default = 200, help = 'runs per case')
+    number = ap.parse_args().number
+    print(f"{'case':<32}{'before':>12}{'after':>12}{'speedup':>10}   (per run, {number} runs)")
+    for case, old, new in bench(number):
+        print(f"{case:<32}{old/number*1e6:>10.1f}us{new/number*1e6:>10.1f}us{old/new:>9.1f}x")
@@ -1,4 +1,5 @@
 # This should not be used by user, but is used by ipyslides to generate layout of slides
+from functools import lru_cache
 
 from ..utils import _build_css
 from ..xmd import get_unique_css_class
@@ -7,7 +8,10 @@ from .intro import get_logo
 
 
 def layout_css(accent_color, aspect):
-    uclass = get_unique_css_class()
+    return _layout_css(get_unique_css_class(), accent_color, aspect)
+
+@lru_cache(maxsize = 16) # rebuilt only when theme or aspect changes, not on each resize
+def _layout_css(uclass, accent_color, aspect):
     return _build_css(
         (uclass,),
         {
@@ -0,0 +1,164 @@
+"File watcher for synced markdown, pushed by inotify on Linux and polling elsewhere."
+import os, sys
+import struct
+import asyncio
+import ctypes, ctypes.util
+from contextlib import contextmanager, suppress
+from pathlib import Path
+
+from ..dashlab import FileWatcher
+
+# IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE, editors save in place or by rename
+_IN_MASK = 0x2 | 0x4 | 0x8 | 0x80 | 0x100 | 0x200
+_EVENT = struct.Struct('iIII') # wd, mask, cookie, len, followed by len bytes of name
+
+def _load_libc():
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        libc.inotify_init1, libc.inotify_add_watch, libc.inotify_rm_watch # raise AttributeError if missing
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+_libc = _load_libc()
+
+
+class _Inotify:
+    "Minimal inotify binding on directories, reads changed file paths without blocking."
+    def __init__(self):
+        self.fd = _libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self._wds = {} # directory -> watch descriptor
+        self._dirs = {} # watch descriptor -> directory
+
+    def watch(self, dirs):
+        "Watch exactly these directories, missing ones are skipped until they exist."
+        for d in set(self._wds) - dirs:
+            _libc.inotify_rm_watch(self.fd, self._wds[d])
+            self._dirs.pop(self._wds.pop(d), None)
+        for d in dirs:
+            wd = _libc.inotify_add_watch(self.fd, os.fsencode(d), _IN_MASK) # same wd if already watched
+            if wd >= 0:
+                self._wds[d], self._dirs[wd] = wd, d
+            elif d in self._wds: # directory removed
+                self._dirs.pop(self._wds.pop(d), None)
+
+    def read(self):
+        "Paths of all files with pending events."
+        paths = set()
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except BlockingIOError:
+                break
+            pos = 0
+            while pos < len(data):
+                wd, _, _, size = _EVENT.unpack_from(data, pos)
+                pos += _EVENT.size
+                if (d := self._dirs.get(wd)) and size:
+                    paths.add(os.path.join(d, os.fsdecode(data[pos:pos + size].rstrip(b'\0'))))
+                pos += size
+        return paths
+
+    def close(self):
+        os.close(self.fd)
+
+
+class SyncWatcher(FileWatcher):
+    """FileWatcher which is pushed by inotify events on Linux, so files are checked right after an edit instead of on next tick.
+    Bursts of events, like an editor's save, are coalesced into one check after `debounce` milliseconds of quiet.
+    While inotify works, polling only runs every `idle` milliseconds as a safety net. Otherwise, e.g. without inotify 
+    or a selector based event loop, it is a plain FileWatcher polling every `interval`.
+    Only public API of FileWatcher (running, interval, assets, lock) is used, except in `check`."""
+    def __init__(self, file_path, interval=500, debounce=50, idle=5000, **kwargs):
+        self._path = Path(file_path).absolute()
+        self._debounce = debounce / 1000
+        self._poll = interval # given interval, restored when inotify is not used
+        self._idle = max(interval, idle)
+        self._notify = None
+        self._handle = None # pending coalesced check
+        self._locks = 0
+        super().__init__(file_path, interval=interval, **kwargs)
+        self.observe(self._on_running, names='running') # FileWatcher handles polling itself
+        self.observe(self._on_assets, names='assets')
+        self._on_running({'new': self.running})
+    
+    @contextmanager
+    def lock(self):
+        "Context manager to temporarily halt checks, including those pushed by inotify."
+        self._locks += 1
+        try:
+            with super().lock():
+                yield self
+        finally:
+            self._locks -= 1
+    
+    def check(self):
+        """Check files now, as a tick of polling does. This is the only use of FileWatcher internals, 
+        if that is not available in installed dashlab, watcher falls back to polling."""
+        if (check := getattr(self, '_check_file_system', None)) is None:
+            return self._unwatch()
+        check()
+
+    def _on_running(self, change):
+        self._unwatch()
+        if change['new'] and self._watch():
+            self.interval = self._idle # polling is only a safety net now
+
+    def _watch(self):
+        if _libc is None:
+            return False
+        try:
+            self._loop = asyncio.get_event_loop()
+            self._notify = _Inotify()
+            self._loop.add_reader(self._notify.fd, self._on_events)
+        except (OSError, NotImplementedError, RuntimeError): # e.g. ProactorEventLoop has no add_reader
+            self._unwatch()
+            return False
+        self._update_watches()
+        return True
+
+    def _unwatch(self):
+        if self._handle:
+            self._handle.cancel()
+            self._handle = None
+        if self._notify:
+            with suppress(Exception): # reader may not be added yet
+                self._loop.remove_reader(self._notify.fd)
+            self._notify.close()
+            self._notify = None
+            self.interval = self._poll # plain polling again
+
+    def _targets(self):
+        return {str(self._path), *(str(Path(p).absolute()) for p in self.assets)}
+
+    def _update_watches(self):
+        self._notify.watch({os.path.dirname(p) for p in self._targets()})
+
+    def _schedule(self):
+        if self._handle:
+            self._handle.cancel()
+        self._handle = self._loop.call_later(self._debounce, self._flush)
+
+    def _on_events(self):
+        if self._notify.read() & self._targets():
+            self._schedule()
+
+    def _on_assets(self, change):
+        if self._notify:
+            self._update_watches()
+            self._schedule() # new assets are checked at once, like the next tick of polling
+
+    def _flush(self):
+        self._handle = None
+        if self._locks: # check again after lock is released
+            return self._schedule()
+        self._update_watches() # directories may have been recreated
+        self.check()
+
+    def close(self):
+        self._unwatch()
+        super().close()
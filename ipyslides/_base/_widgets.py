@@ -22,6 +22,7 @@ class InteractionWidget(anywidget.AnyWidget):
     _uid = traitlets.Unicode(str(uuid.uuid1()), read_only=True).tag(sync=True) # need for frontend display purporse
     _colors = traitlets.Dict(jupyter_colors).tag(sync=True) # for export
     _parts = traitlets.Dict().tag(sync=True) # parts data for each slide, for js side use
+    _frames = traitlets.Dict().tag(sync=True) # slide number -> [frames count, current frame], frames are switched in frontend
     _main_end = traitlets.Int(default_value=0).tag(sync=True) # last main slide index
     _fpad = traitlets.Int(16).tag(sync=True) # padding for footer, used in export
     
@@ -2,6 +2,7 @@
 import re, textwrap
 import traceback
 import inspect
+from difflib import SequenceMatcher
 from pathlib import Path
 
 from IPython.display import display
@@ -15,7 +16,8 @@ from .export_html import _HhtmlExporter
 from ..formatters import XTML, htmlize, slidebound
 from ..xmd import error, resolve_included_files, _parse_as_snapshots, _stream_chunks
 from ..utils import _css_info
-from ..dashlab import FileWatcher
+from .slide import Slide, _build_slide
+from ._watcher import SyncWatcher
 
 
 class BaseSlides:
@@ -27,6 +29,7 @@ class BaseSlides:
         self.export_html = _HhtmlExporter(self).export_html
         self.notes = Notes(self, self.widgets) # Needs main class for access to notes
         self.widgets.checks.toast.observe(self._toggle_notify,names=['value'])
+        self._synced_slides = [] # slides in order of chunks in synced file, to match them on next edit
     
     def __setattr__(self, name: str, value):
         if not name.startswith('_') and hasattr(self, name):
@@ -106,27 +109,80 @@ class BaseSlides:
         if not isinstance(content, str): #check path later or it will throw error
             raise TypeError(f"content expects a makrdown string, got {content!r}")
         
+        # Flatten incuded files, their lines are re-read only if changed on disk. Only chunks embedding 
+        # a changed part of an included file differ from last sync, so only those slides are rebuilt below.
+        graph = {}
+        content = resolve_included_files(content, graph)
+        
         # included files should be able to trigger updates even if main file not edited yet, so we track them as assets
-        if hasattr(self, '_src_watcher'):
-            self._src_watcher.assets = re.findall(r'include\`(.*?)\`',content, flags = re.DOTALL)
+        if hasattr(self, '_src_watcher') and set(self._src_watcher.assets) != set(graph):
+            self._src_watcher.assets = list(graph) # absolute paths without line ranges, resetting assets forces a rescan
         
-        # Now flatten incuded files, after detecting them as assets above
-        content = resolve_included_files(content)
         content = self._process_citations(content) # after resolve, enable citations form included files
         
         chunks = list(_stream_chunks(content, '---'))
-        handles = self.create(range(0, len(chunks))) # create slides faster or return older
         
         last_updated = None
-        for chunk, hdl in zip(chunks, handles):
-            if chunk != hdl._markdown:
-                with self.slide(hdl.number) as last_updated:
-                    self.src(chunk, **(hdl._md_vars if isinstance(hdl._md_vars, dict) else {})) # preserve variables if they were updated from python code
+        with self._batch_build(): # deck-wide updates once after all changed slides are built
+            handles = self._match_synced_slides(chunks) # unchanged chunks keep their slides, even if moved
+            for chunk, hdl in zip(chunks, handles):
+                if chunk != hdl._markdown:
+                    with _build_slide(self, hdl.number) as last_updated: # no need to inspect caller code like Slides.slide
+                        self.src(chunk, **(hdl._md_vars if isinstance(hdl._md_vars, dict) else {})) # preserve variables if they were updated from python code
         
         self._next_number = len(handles) # update next number to avoid overwrites from python on these slides accidentally
         if last_updated: 
             self.navigate_to(last_updated.index) # go to last edited slide
     
+    def _match_synced_slides(self, chunks):
+        "Assign slides to chunks by diffing with last synced chunks, renumber moved ones and return slides in order of chunks."
+        old = [s for s in self._synced_slides if self._slides_dict.get(s.number) is s] # cleared slides can't be reused
+        matcher = SequenceMatcher(None, [s._markdown for s in old], chunks, autojunk=False)
+        
+        placed = {} # chunk index -> unchanged slide
+        for a, b, size in matcher.get_matching_blocks():
+            for i, s in zip(range(b, b + size), old[a:a + size]):
+                if i == s.number or (i and not re.search(rf"\.n{s.number}\b", 
+                    ''.join(out.data.get('text/html', '') for out in s._contents))): # content CSS bound to number needs a rebuild
+                    placed[i] = s
+        
+        used = set(placed.values())
+        spare = (s for s in old if s not in used) # reuse their widgets for changed chunks
+        slides = []
+        for i in range(len(chunks)):
+            if not (s := placed.get(i)):
+                if (s := self._slides_dict.get(i)) in used or s is None:
+                    s = next(spare, None) or Slide(self, i)
+                used.add(s)
+            slides.append(s)
+        
+        moved = False
+        for i, s in enumerate(slides):
+            if s.number != i:
+                s._widget.remove_class(f"n{s.number}").add_class(f"n{i}")
+                s._number = i
+                if s._fidxs: # frame CSS is bound to number
+                    s._update_frames_css()
+                moved = True
+        
+        for s in old: # leftover slides from deleted chunks
+            if s not in used:
+                s._citations.clear() # Break circular references
+                s._widget.outputs = () # clear output to free visual clutter
+                s._contents = [] # clear contents to free memory
+                self._index_vars(s) # removed from reverse index of variables
+                moved = True
+        
+        others = {n: s for n, s in self._slides_dict.items() if n >= len(chunks) and s not in used and s not in old} # python slides after synced ones
+        new_dict = {**others, **{s.number: s for s in slides}}
+        if moved or new_dict != self._slides_dict: # slides compare by identity
+            self._slides_dict = new_dict
+            self._batch_sections = moved or self._batch_sections # footers show numbers and sections
+            self.refresh()
+        
+        self._synced_slides = slides
+        return slides
+    
     def _process_citations(self, content):
         # This is exclusive to synced file only, so do not make it a block or something else
         blocks = re.split('^---\s*citations\s*---\s*', content, flags=re.IGNORECASE | re.MULTILINE)
@@ -145,7 +201,8 @@ class BaseSlides:
     
     def sync_with_file(self, path, interval=500):
         r"""Auto update slides when content of markdown file changes. You can stop syncing using `Slides.unsync` function.
-        interval is in milliseconds, 500 ms default. Read `Slides.slide` docs about content of file.
+        On Linux, changes are picked up from inotify events as soon as a save is finished, otherwise files are 
+        checked every `interval` milliseconds, 500 ms default. Read `Slides.slide` docs about content of file.
         
         The variables inserted in file content are used from notebook's global scope.
         
@@ -186,7 +243,7 @@ class BaseSlides:
         if hasattr(self, '_src_watcher'):
             self.unsync() # clear any existing file watcher before setting a new one
         
-        self._src_watcher = FileWatcher(path, interval=interval)
+        self._src_watcher = SyncWatcher(path, interval=interval)
         
         # First call after watcher set, so it can observe included files immediately, 
         # and errors must be caught before going forward
@@ -2,15 +2,20 @@
 Export Slides to static HTML slides. It is used by program itself, 
 not by end user.
 """
-import os, re
+import os, re, json, zlib, shutil
+import urllib.request
+import base64, hashlib, mimetypes
 import textwrap
+from html import unescape
+from functools import lru_cache
 from contextlib import suppress
 from pathlib import Path
 
-from .export_template import doc_html
+from .export_template import doc_head, doc_tail, vendor_files
 from . import styles
 from ..writer import _fmt_html
 from ..formatters import _inline_style
+from ..utils import get_child_dir
 
 
 _script = '''<script>
@@ -45,77 +50,284 @@ _script = '''<script>
 </script>'''
 
 
+# base64 data URIs large enough to be worth sharing, small icons stay inline
+_DATA_URI_RE = re.compile(r'data:([\w.+-]+/[\w.+-]+)(?:;[\w.+-]+=[\w.+-]+)*;base64,\s*([A-Za-z0-9+/]{1024,}={0,2})')
+
+_assets_script = '''<script>
+    (function() {
+        let data = JSON.parse(document.getElementById('ips-assets').textContent);
+        let urls = {};
+        for (let [key, [mime, b64]] of Object.entries(data)) {
+            let bin = atob(b64), arr = new Uint8Array(bin.length);
+            for (let i = 0; i < bin.length; i++) { arr[i] = bin.charCodeAt(i); }
+            urls[key] = URL.createObjectURL(new Blob([arr], {type: mime}));
+        }
+        let fix = (text) => text.replace(/ips-asset:(\w+)/g, (m, key) => urls[key] || m);
+        window.ipsResolveAssets = (root) => { // lazy sections are resolved when attached
+            for (let attr of ['src', 'href', 'xlink:href', 'style', 'srcset']) {
+                root.querySelectorAll(`[${attr.replace(':', '\\\\:')}*="ips-asset:"]`).forEach(el => {
+                    el.setAttribute(attr, fix(el.getAttribute(attr)));
+                });
+            }
+            root.querySelectorAll('style').forEach(st => {
+                if (st.textContent.includes('ips-asset:')) { st.textContent = fix(st.textContent); }
+            });
+        };
+        window.ipsResolveAssets(document);
+    })();
+</script>'''
+
+_lazy_script = '''<script>
+    (function() {
+        let lazy = __LAZY__; // otherwise all sections are attached as soon as they are available
+        let sections = document.querySelectorAll('section.ips-lazy');
+        let bodies = {}; // section id -> html from compressed payload, if any
+        let attach = (sec) => {
+            let tpl = sec.querySelector(':scope > template');
+            let body = bodies[sec.id];
+            if (!tpl && body === undefined) return; // attached already or not decompressed yet
+            if (tpl) {
+                sec.replaceChild(document.importNode(tpl.content, true), tpl); // imported scripts run as well
+            } else {
+                sec.replaceChildren(document.createRange().createContextualFragment(body)); // runs scripts too
+                delete bodies[sec.id];
+            }
+            sec.classList.remove('ips-lazy');
+            if (window.ipsResolveAssets) { window.ipsResolveAssets(sec); }
+            if (window.MathJax && MathJax.typesetPromise) { MathJax.typesetPromise([sec]); } // offline export has MathJax 3
+            else if (window.MathJax && MathJax.Hub) { MathJax.Hub.Queue(["Typeset", MathJax.Hub, sec]); }
+        };
+        let attachAll = () => sections.forEach(attach);
+        let toHash = () => { // links to elements inside sections not yet attached
+            let id = decodeURIComponent(location.hash.slice(1));
+            if (id && !document.getElementById(id)) {
+                attachAll();
+                let el = document.getElementById(id);
+                if (el) { el.scrollIntoView(); }
+            }
+        };
+        
+        let observer = null;
+        if (lazy && ('IntersectionObserver' in window)) {
+            observer = new IntersectionObserver((entries) => {
+                entries.forEach(entry => {
+                    if (entry.isIntersecting) {
+                        attach(entry.target);
+                        if (!entry.target.classList.contains('ips-lazy')) { observer.unobserve(entry.target); }
+                    }
+                });
+            }, {root: document.querySelector('.SlidesWrapper'), rootMargin: '0px 100% 0px 100%'}); // a slide ahead on both sides
+            sections.forEach(sec => observer.observe(sec));
+        } else {
+            attachAll();
+        }
+        window.addEventListener('beforeprint', attachAll);
+        window.addEventListener('hashchange', toHash);
+        toHash();
+        
+        let payload = document.getElementById('ips-sections');
+        if (payload) { // single gzip stream of all sections, decompressed once by browser
+            let bin = atob(payload.textContent.trim()), arr = new Uint8Array(bin.length);
+            for (let i = 0; i < bin.length; i++) { arr[i] = bin.charCodeAt(i); }
+            let stream = new Blob([arr]).stream().pipeThrough(new DecompressionStream('gzip'));
+            new Response(stream).text().then(text => {
+                bodies = JSON.parse(text);
+                if (observer) { // observing again reports sections already in view
+                    sections.forEach(sec => { observer.unobserve(sec); observer.observe(sec); });
+                } else {
+                    attachAll();
+                }
+                toHash();
+            });
+        }
+    })();
+</script>'''
+
+def _split_section(html):
+    "Split section into its opening tag without '>', body and end."
+    start, _, body = html.partition('>')
+    body, _, end = body.rpartition('</section>')
+    return start, body, end
+
+def _lazy_section(html):
+    "Keep section in place for scroll snapping, but its body in an inert template until it comes near view."
+    start, body, end = _split_section(html)
+    return f'{start} class="ips-lazy"><template>{body}</template></section>{end}'
+
+class _Packer:
+    """Section bodies compressed into a single gzip stream of JSON object by section id, so that repeated CSS
+    and footers across sections compress well. Sections are left as empty placeholders and filled by a script."""
+    def __init__(self):
+        self._zip = zlib.compressobj(9, zlib.DEFLATED, 31) # wbits 31 for gzip container, which DecompressionStream reads
+        self._parts = [] # compressed bytes are small enough to keep until end
+        self._sep = '{'
+    
+    def __call__(self, html):
+        start, body, end = _split_section(html)
+        sec_id = re.search(r'id="([^"]+)"', start).group(1)
+        self._parts.append(self._zip.compress(f'{self._sep}{json.dumps(sec_id)}:{json.dumps(body, ensure_ascii=False)}'.encode('utf-8')))
+        self._sep = ','
+        return f'{start} class="ips-lazy"></section>{end}'
+    
+    def tail(self):
+        "Compressed payload, written after all sections."
+        self._parts.append(self._zip.compress(b'}' if self._sep == ',' else b'{}') + self._zip.flush())
+        return f'<script type="application/gzip" id="ips-sections">{base64.b64encode(b"".join(self._parts)).decode("ascii")}</script>'
+
+def _digest(text):
+    return hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).hexdigest()
+
+_STYLE_RE = re.compile(r'(<script\b.*?</script>)|<style>(.*?)</style>', re.DOTALL) # style blocks, but not text in scripts
+
+class _Styles:
+    """Drops repeated <style> blocks in sections and puts the rest before their section, so lazy sections get them too.
+    Blocks bound to id of a frame are written once for all frames of slide with :is(#id0,#id1,...), which keeps specificity of id.
+    A repeated block keeps its first place, which only matters if a different block in between overrides same selectors."""
+    def __init__(self):
+        self._seen = set()
+        self.saved = 0 # bytes
+    
+    def __call__(self, html, sec_uid, frame_ids):
+        "Returns (styles, section) for section with id `sec_uid` among `frame_ids` of its slide."
+        if '<style>' not in html:
+            return '', html
+        
+        own_id = re.compile(rf'#{re.escape(sec_uid)}(?![\w-])')
+        shared = f':is({",".join("#" + i for i in frame_ids)})' if len(frame_ids) > 1 else f'#{sec_uid}'
+        kept = []
+        def hoist(match):
+            if match.group(1): # script
+                return match.group()
+            css = own_id.sub('\0', match.group(2))
+            key = (frame_ids[0], css) if '\0' in css else css # bound ones are only shared in slide
+            if key not in self._seen:
+                self._seen.add(key)
+                css = css.replace('\0', shared)
+                kept.append(f'<style>{css}</style>')
+            return ''
+        
+        section = _STYLE_RE.sub(hoist, html)
+        styles = ''.join(kept)
+        self.saved += len(html) - len(section) - len(styles)
+        return styles, section
+
+def _copy_vendor(folder, math = True):
+    "Copy runtime libraries to `folder`, they are downloaded once into .ipyslides-assets/vendor and reused after that."
+    cache = get_child_dir('.ipyslides-assets', 'vendor', create = True)
+    for name, url in vendor_files.items():
+        if not math and name.startswith('mathjax/'):
+            continue
+        if not (src := cache / name).is_file():
+            try:
+                with urllib.request.urlopen(url, timeout = 30) as response:
+                    data = response.read()
+            except OSError as e:
+                raise ConnectionError(f"Could not download {url} for offline export: {e}. Export once with internet access or put that file at {str(src)!r}.") from None
+            src.parent.mkdir(parents = True, exist_ok = True)
+            src.with_name(src.name + '.part').write_bytes(data)
+            os.replace(src.with_name(src.name + '.part'), src) # no half files in cache
+        
+        if not (dst := folder / name).is_file() or dst.stat().st_size != src.stat().st_size:
+            dst.parent.mkdir(parents = True, exist_ok = True)
+            shutil.copyfile(src, dst)
+
+class _Assets:
+    """Content-hashed store for base64 payloads of data URIs in export, so a repeated image is written once.
+    mode 'folder' writes files in a sidecar folder, 'shared' keeps a single copy at end of document resolved by a script."""
+    def __init__(self, mode, folder):
+        self.mode = mode
+        self.folder = Path(folder)
+        self._shared = {} # hash -> (mime, payload)
+    
+    def __call__(self, html):
+        return _DATA_URI_RE.sub(self._replace, html)
+    
+    def _replace(self, match):
+        mime, payload = match.groups()
+        key = hashlib.blake2b(payload.encode('ascii'), digest_size=12).hexdigest()
+        if self.mode == 'shared':
+            self._shared.setdefault(key, (mime, payload))
+            return f'ips-asset:{key}'
+        
+        name = key + (mimetypes.guess_extension(mime) or '.bin')
+        if not (path := self.folder / name).is_file(): # same content is same file, across exports too
+            self.folder.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(base64.b64decode(payload))
+        return f'{self.folder.name}/{name}'
+    
+    def tail(self):
+        "Shared payloads and their resolver, written after all sections."
+        if not self._shared:
+            return ''
+        return f'<script type="application/json" id="ips-assets">{json.dumps(self._shared)}</script>\n{_assets_script}'
+
+
+# Same delimiters as MathJax config in export, skipping text in tags and in elements which MathJax does not process.
+_MATH_RE = re.compile(r'''(?P<skip><(?P<tag>script|style|pre|code|textarea)\b.*?</(?P=tag)\s*>|<[^>]*>)
+    |(?P<esc>\\\$)
+    |\$\$(?P<display>[^$<]+?)\$\$
+    |(?P<env>\\begin\{(?P<name>[\w*]+)\}[^<]*?\\end\{(?P=name)\})
+    |\$(?P<inline>[^$<]+?)\$''', re.DOTALL | re.IGNORECASE | re.VERBOSE)
+
+@lru_cache(maxsize = 4096) # same TeX across slides, frames and exports is converted once
+def _tex_to_mathml(tex, display):
+    "MathML for TeX string, None if engine can not convert it."
+    from latex2mathml.converter import convert
+    try:
+        return convert(tex, display = 'block' if display else 'inline')
+    except Exception: # engine raises various errors on unsupported commands
+        return None
+
+class _Math:
+    """Renders TeX in sections to MathML once at export, which browsers show natively, so page needs no MathJax.
+    Equations which could not be converted are left as TeX and counted in `failed`."""
+    def __init__(self):
+        try:
+            import latex2mathml # noqa: F401
+        except ImportError:
+            raise ImportError("static_math = True needs latex2mathml, install it by `pip install latex2mathml`.") from None
+        self.failed = 0
+    
+    def __call__(self, html):
+        if '$' not in html and '\\begin{' not in html:
+            return html
+        return _MATH_RE.sub(self._replace, html)
+    
+    def _replace(self, match):
+        if match['skip']:
+            return match.group()
+        if match['esc']:
+            return '$' # processEscapes in MathJax
+        
+        tex, display = (match['inline'], False) if match['inline'] is not None else (
+            (match['display'], True) if match['display'] is not None else (match['env'], True))
+        if (mathml := _tex_to_mathml(unescape(tex).strip(), display)) is None:
+            self.failed += 1
+            return match.group()
+        return mathml
+
+
 class _HhtmlExporter:
     # Should be used inside Slides class only.
     def __init__(self, _instance_BaseSlides):
         self.main = _instance_BaseSlides
         self.main.widgets.buttons.export.on_click(self._export) # Export button
+        self._cached = {} # slide number -> (build and frames spec, {chrome digest: section digest}) from last export, html is on disk
+        self._css_saved = 0 # bytes of repeated styles removed in last export
         
     def _htmlize(self):
-        content = ''
-        for item in self.main:
-            objs = item.contents # get conce
-            frames = []
-            
-            if not item._fidxs:
-                frames = [objs]
-            else:
-                for fi, frame in enumerate(item._fidxs):
-                    start, end, part = [frame.get(k, -1) - item._offset for k in ('start','end','part')]
-                    frame_objs = []
-                    
-                    if not "part" in frame: # full content in range
-                        frame_objs.extend(objs[start:end + 1])
-                    else: # partial content in range
-                        snapshots_persist = frame.get("_snapshots_persist")
-                        snapshots_persist_idx = None
-                        if isinstance(snapshots_persist, dict) and isinstance(snapshots_persist.get("idx"), int):
-                            snapshots_persist_idx = snapshots_persist["idx"] - item._offset
-                        for i in range(start, end + 1):
-                            if i < part:
-                                # Check if this writer has persisted snapshots metadata.
-                                if snapshots_persist and i == snapshots_persist_idx and hasattr(objs[i], "fmt_html"):
-                                    frame_objs.append(objs[i].fmt_html(snapshots_persist))
-                                # Fallback: any completed snapshots writer before current part keeps only last rows
-                                elif hasattr(objs[i], "fmt_html") and getattr(objs[i], "_snapshots_cols", None):
-                                    clr = dict(getattr(objs[i], "_snapshots_cols", {}) or {})
-                                    frame_objs.append(objs[i].fmt_html({"_snapshots_last_rows": clr}))
-                                else:
-                                    frame_objs.append(objs[i])
-                            elif i > part:
-                                frame_objs.append(f"<div style='visibility:hidden;'>{_fmt_html(objs[i])}</div>")
-                            else: # i == part, can be Writer
-                                if "col" in frame and hasattr(objs[i], "fmt_html"): # Writer with columns
-                                    frame_objs.append(objs[i].fmt_html(frame))
-                                else: # normal Writer
-                                    frame_objs.append(objs[i])
-                
-                    frames.append(frame_objs)
-            
-            for k, objs in enumerate(frames):
-                _html = item._speaker_notes(returns=True) # speaker notes at top if any, returns string
-                for out in objs:
-                    _html += f'<div class="jp-OutputArea-child"><div class="jp-OutputArea-output" style="width: 100%;">{_fmt_html(out)}</div></div>' 
-                    # Important to have each content in similar node structure as notebook content
-
-                _html = f'<div class="jp-OutputArea">{_html}</div>'
-
-                sec_uid = item._sec_id if k == 0 else f"{item._sec_id}-{k}"
-                sec_id = f'id="{sec_uid}"'
-                content += textwrap.dedent(f'''
-                    <section {sec_id}>
-                        {self._get_css(item, sec_uid)}
-                        <div class="SlideBox">
-                            {item._get_bg_image(f'#{sec_uid}', ikws = item._bg_ikws)}
-                            <div class="{item._css_class} export-only">
-                                {_html}
-                            </div>
-                            {self.main.settings.footer._to_html(item, fidx=k)}
-                        </div>
-                    </section>''')
-        
-        content += self._get_logo() # Both of these fixed
-            
+        return ''.join(self._iter_html())
+    
+    def _iter_html(self, assets = None, lazy = False, compress = False, vendor = None, math = None, store = None):
+        """Yield exported document in pieces, a section per frame, so it can be written without holding whole deck in memory.
+        If `store` folder is given, sections are written there by their digest and unchanged ones are read back on next export.
+        If `assets` is an `_Assets` instance, data URIs in pieces are replaced by references to shared payloads.
+        If `lazy`, all sections except first are attached to document by a script when they come near view.
+        If `compress`, all sections except first are written in a single gzip stream at end, which a script decompresses.
+        If `vendor` folder is given, libraries are loaded from there instead of CDN.
+        If `math` is a `_Math` instance, equations in sections are rendered to MathML and MathJax is left out."""
+        fix = assets or (lambda html: html)
+        render = math or (lambda html: html)
         theme_kws = self.main.settings._theme_kws
         
         if self.main.widgets.theme.value == "Jupyter":  # jupyterlab themes colors to export
@@ -128,15 +340,172 @@ class _HhtmlExporter:
             css_classes.append(self.main.uid)
             
         overall_css = ''.join(f'{s._yoffset_css(True)}\n{s._style_css(True)}' for s in self.main[:1]) # only one time
-        return doc_html(
+        yield fix(doc_head(
             code_css    = self.main.widgets.htmls.hilite.value.replace(f'.{self.main.uid}',''), # remove id from code here
             style_css   = self.main.html('style', styles.style_css(**theme_kws, _root=True) + self._stacking_css()).value + overall_css,
-            content     = content, 
-            script      = _script, 
             css_class   = ' '.join(css_classes),
             padding_bottom = self.main.widgets.iw._fpad,
-            )
+            vendor = vendor,
+            static_math = bool(math),
+            ))
+        
+        cached = {} # only slides of this export are kept for next one
+        packer = _Packer() if compress else None
+        shared = _Styles()
+        eager = True # first section is shown at load, so never lazy or compressed
+        for item in self.main:
+            frame_ids = [item._sec_id, *(f'{item._sec_id}-{k}' for k in range(1, len(item._fidxs) or 1))]
+            for k, html in enumerate(self._sections(item, cached, store)): # generator runs to end to cache slide
+                css, html = shared(render(fix(html)), frame_ids[k], frame_ids)
+                if css:
+                    yield css
+                if eager:
+                    yield html
+                elif packer:
+                    yield packer(html)
+                else:
+                    yield _lazy_section(html) if lazy else html
+                eager = False
+        if store:
+            self._cached = cached
+            self._prune_store(store)
+        self._css_saved = shared.saved
+        
+        yield fix(self._get_logo()) # Both of these fixed
+        if assets:
+            yield assets.tail()
+        if packer:
+            yield packer.tail()
+        if lazy or compress:
+            yield _lazy_script.replace('__LAZY__', 'true' if lazy else 'false')
+        yield doc_tail(script = _script, padding_bottom = self.main.widgets.iw._fpad)
+    
+    def _sections(self, item, cached, store = None):
+        """Sections for all frames of a slide. Slides not rebuilt since last export read their sections from `store` if chrome 
+        around contents is unchanged too, so re-exports after an edit only serialize edited slides. Widgets and TOC are always fresh.
+        Only digests are kept in memory, so a single section is held at a time."""
+        store = None if self._is_live(item) else store
+        spec = (item._build, repr(item._fidxs), getattr(item, '_offset', 0))
+        old = self._cached.get(item.number) if store else None
+        reuse = old[1] if old and old[0] == spec else {}
+        sections = {}
+        frames, memo = None, {} # per slide, frames share serialized objects
+        for k in range(len(item._fidxs) or 1):
+            chrome = self._chrome(item, k)
+            key, html = _digest(repr(chrome)), None
+            if (name := reuse.get(key)):
+                with suppress(OSError): # removed by user, serialized again
+                    html = (store / f'{name}.html').read_text(encoding = 'utf-8')
+            if html is None:
+                if frames is None:
+                    frames = self._frames(item, memo)
+                html = self._section(chrome, frames[k], memo)
+                name = _digest(html)
+                if store and not (path := store / f'{name}.html').is_file(): # same content is same file
+                    store.mkdir(parents = True, exist_ok = True)
+                    path.write_text(html, encoding = 'utf-8')
+            sections[key] = name
+            yield html
+        
+        if store:
+            cached[item.number] = (spec, sections)
+    
+    def _prune_store(self, store):
+        "Remove sections not used by last export from `store`."
+        used = {f'{name}.html' for _, sections in self._cached.values() for name in sections.values()}
+        with suppress(OSError):
+            for path in store.iterdir():
+                if path.name not in used:
+                    path.unlink()
+    
+    def _is_live(self, item):
+        "Whether slide shows objects which may change without a rebuild."
+        return item._has_widgets or bool(item._toc_args) or any(
+            '_MODEL_ID' in out.metadata or 'DataTOC' in out.metadata for out in item._contents)
+    
+    def _fmt_once(self, out, memo, hidden=False):
+        "Serialize an object of slide only once for all frames, keyed by identity. Plain strings need no work."
+        if isinstance(out, str) and not hidden:
+            return out
+        key = (id(out), hidden)
+        if key not in memo: # object kept in memo so its id is not reused during export of slide
+            html = _fmt_html(out)
+            memo[key] = (out, f"<div style='visibility:hidden;'>{html}</div>" if hidden else html)
+        return memo[key][1]
+    
+    def _frames(self, item, memo):
+        "List of objects to show in each frame of a slide."
+        objs = item.contents # get conce
+        if not item._fidxs:
+            return [objs]
+        
+        frames = []
+        for fi, frame in enumerate(item._fidxs):
+            start, end, part = [frame.get(k, -1) - item._offset for k in ('start','end','part')]
+            frame_objs = []
+            
+            if not "part" in frame: # full content in range
+                frame_objs.extend(objs[start:end + 1])
+            else: # partial content in range
+                snapshots_persist = frame.get("_snapshots_persist")
+                snapshots_persist_idx = None
+                if isinstance(snapshots_persist, dict) and isinstance(snapshots_persist.get("idx"), int):
+                    snapshots_persist_idx = snapshots_persist["idx"] - item._offset
+                for i in range(start, end + 1):
+                    if i < part:
+                        # Check if this writer has persisted snapshots metadata.
+                        if snapshots_persist and i == snapshots_persist_idx and hasattr(objs[i], "fmt_html"):
+                            frame_objs.append(objs[i].fmt_html(snapshots_persist))
+                        # Fallback: any completed snapshots writer before current part keeps only last rows
+                        elif hasattr(objs[i], "fmt_html") and getattr(objs[i], "_snapshots_cols", None):
+                            clr = dict(getattr(objs[i], "_snapshots_cols", {}) or {})
+                            frame_objs.append(objs[i].fmt_html({"_snapshots_last_rows": clr}))
+                        else:
+                            frame_objs.append(objs[i])
+                    elif i > part:
+                        frame_objs.append(self._fmt_once(objs[i], memo, hidden=True))
+                    else: # i == part, can be Writer
+                        if "col" in frame and hasattr(objs[i], "fmt_html"): # Writer with columns
+                            frame_objs.append(objs[i].fmt_html(frame))
+                        else: # normal Writer
+                            frame_objs.append(objs[i])
+        
+            frames.append(frame_objs)
+        return frames
+    
+    def _chrome(self, item, k):
+        "Parts of section around contents for frame k of slide item, these also depend on settings and other slides."
+        sec_uid = item._sec_id if k == 0 else f"{item._sec_id}-{k}"
+        return (
+            sec_uid,
+            item._speaker_notes(returns=True), # speaker notes at top if any, returns string
+            self._get_css(item, sec_uid),
+            item._get_bg_image(f'#{sec_uid}', ikws = item._bg_ikws),
+            item._css_class,
+            self.main.settings.footer._to_html(item, fidx=k),
+        )
+    
+    def _section(self, chrome, objs, memo):
+        "HTML section for a frame from its objects and chrome."
+        sec_uid, _html, css, bg_image, css_class, footer = chrome
+        for out in objs:
+            _html += f'<div class="jp-OutputArea-child"><div class="jp-OutputArea-output" style="width: 100%;">{self._fmt_once(out, memo)}</div></div>' 
+            # Important to have each content in similar node structure as notebook content
 
+        _html = f'<div class="jp-OutputArea">{_html}</div>'
+
+        sec_id = f'id="{sec_uid}"'
+        return textwrap.dedent(f'''
+                    <section {sec_id}>
+                        {css}
+                        <div class="SlideBox">
+                            {bg_image}
+                            <div class="{css_class} export-only">
+                                {_html}
+                            </div>
+                            {footer}
+                        </div>
+                    </section>''')
 
     def _stacking_css(self):
         """Generate export-only translateZ rules to preserve stacking for nested positioned elements."""
@@ -165,28 +534,61 @@ class _HhtmlExporter:
             {self.main.widgets.htmls.logo.value} 
         </div>'''
                 
-    def _writefile(self, path, overwrite = False):
+    def _writefile(self, path, overwrite = False, assets = None, lazy = False, compress = False, offline = False, static_math = False):
         if os.path.isfile(path) and not overwrite:
             return print(f'File {path!r} already exists. Use overwrite=True to overwrite.')
         
-        with open(path,'w', encoding="utf-8") as f: # encode to utf-8 to handle emojis
-            f.write(self._htmlize()) 
+        math = _Math() if static_math else None # before writing, so a missing engine does not touch existing file
+        if offline: # before writing, so a failed download does not touch existing file
+            _copy_vendor(Path(path).with_name('vendor'), math = not math)
+        
+        part = f'{path}.part' # existing file is replaced only after a complete export
+        try:
+            with open(part,'w', encoding="utf-8") as f: # encode to utf-8 to handle emojis
+                if assets:
+                    assets = _Assets(assets, Path(path).with_name('assets'))
+                store = Path(path).with_name(f'.{Path(path).stem}-sections') # sections of this file for next export
+                for chunk in self._iter_html(assets, lazy, compress, 'vendor' if offline else None, math, store): # one section at a time in memory
+                    f.write(chunk)
+            os.replace(part, path)
+            if self._css_saved:
+                print(f'Repeated styles in slides were shared, saving {self._css_saved/1024:.1f} KB.')
+            if math and math.failed:
+                print(f'{math.failed} equation(s) could not be rendered to MathML and are left as TeX in {path!r}.')
+        finally:
+            with suppress(OSError):
+                os.remove(part) # only left on failure
             
     
-    def export_html(self, path = 'Slides.html', overwrite = False):
+    def export_html(self, path = 'Slides.html', overwrite = False, assets = None, lazy = False, compress = False, offline = False, static_math = False):
         """Build html slides that you can print.
         
         - Use 'overrides.css' file in same folder to override CSS styles.
         - If a slide has only widgets or does not have single object with HTML representation, it will be skipped.
         - You can take screenshot (using system's tool) of a widget, save it using Clips GUI in side panel and laod as image to keep PNG view of a widget. 
+        - Images are embedded as base64 data in each slide and frame where they appear. Use `assets = 'folder'` to write each image once in an 'assets' folder 
+            next to html file (keep them together when sharing), or `assets = 'shared'` to embed each image once at end of file, which is loaded by a script.
+        - Sections of slides not rebuilt since last export are reused, so exporting again after a small edit is quick. They are kept in 
+            a hidden folder next to html file, named after it, and can be deleted anytime.
+        - Use `lazy = True` for large decks to keep slides out of browser's document until they are scrolled near. It makes opening the file 
+            quick and light, all slides are attached before printing.
+        - Use `compress = True` to write slides as a single gzip stream inside file, which browser decompresses on opening. Text and styles shrink 
+            many times, so it is useful for sharing large decks by email. Images are already compressed, combine with `assets` to avoid their repetition.
+        - Use `offline = True` to load MathJax, FontAwesome, jQuery and RequireJS from a 'vendor' folder next to html file instead of internet, 
+            for presenting on machines without network. Libraries are downloaded once into '.ipyslides-assets/vendor' in notebook's directory and reused.
+        - Use `static_math = True` to render equations to MathML once at export (needs `pip install latex2mathml`), which browsers show without MathJax, 
+            so equation heavy decks open without delay. Equations using commands not supported by converter are left as TeX and reported.
         
         ::: note-info
             - PDF printing of slide width is 210mm (8.25in). Height is determined by aspect ratio provided.
             - Use `Save as PDF` option instead of Print PDF in browser to make links work in output PDF. Alsp enable background graphics in print dialog.
         """
+        if assets not in (None, 'folder', 'shared'):
+            raise ValueError(f"assets should be one of None, 'folder' or 'shared', got {assets!r}")
+        
         if not self._export_ready(): return
         _path = os.path.splitext(path)[0] + '.html' if path != 'Slides.html' else path
-        export_func = lambda: self._writefile(_path, overwrite)
+        export_func = lambda: self._writefile(_path, overwrite, assets, lazy, compress, offline, static_math)
         self.main.widgets.iw._try_exec_with_fallback(export_func)
         
     def _export(self,btn):
@@ -202,6 +604,7 @@ class _HhtmlExporter:
             os.startfile(path) 
     
     def _export_ready(self):
+        self.main._flush_rebuilds() # slides queued for idle time must be up to date in export
         if not self.main._next_pending: return True
         self.main.notify(self.main.error("Export Error", "Please build pending slides by naviagting/clicking on 'Pending Slides' button before you can export to HTML.").value)
         return False
\ No newline at end of file
@@ -1,6 +1,11 @@
 # Template for building HTML from slides 
 
-def doc_html(code_css, style_css, content, script, css_class, padding_bottom):
+def doc_head(code_css, style_css, css_class, padding_bottom, vendor = None, static_math = False):
+    """Document up to the slides container, sections are written after it.
+    If `vendor` folder is given, libraries are loaded from there instead of CDN, see `vendor_files`.
+    If `static_math`, equations are already rendered to MathML and MathJax is not loaded."""
+    scripts, fonts, math = _vendor_libs(vendor) if vendor else (_cdn_scripts, _cdn_fonts, _cdn_math)
+    fonts_math = fonts + (_static_math_css if static_math else math)
     return f'''<!DOCTYPE html>
 <html lang="en">
 <head>
@@ -9,44 +14,94 @@ def doc_html(code_css, style_css, content, script, css_class, padding_bottom):
     <link rel="icon" type="image/svg+xml" href="data:image/svg+xml,%3Csvg viewBox='0 0 50 50' xmlns='http://www.w3.org/2000/svg' fill='none' stroke='currentColor' stroke-linecap='butt' stroke-linejoin='round' stroke-width='7.07'%3E%3Cpath d='M22.5 7.5L10 20L20 30L30 20L40 30L27.5 42.5' stroke='%2343D675'/%3E%3Cpath d='M7.5 27.5L22.5 42.5' stroke='%234F8EF7'/%3E%3Cpath d='M32.5 32.5L20 20L30 10L42.5 22.5' stroke='%234F8EF7'/%3E%3C/svg%3E">
     <title>Slides</title>
     
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/require.js/2.1.10/require.min.js"></script>
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/jquery/2.0.3/jquery.min.js"></script> 
-    
+{scripts}    
     {style_css}
     {slides_css.replace("__PADBTM__",str(padding_bottom))}
     {code_css}
 
     <!-- Custom stylesheet, it must be in the same directory as the html file -->
     <link rel="stylesheet" href="overrides.css">
-    <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.5.1/css/all.min.css" integrity="sha512-DTOQO9RWCH3ppGqcWaEA1BIZOC6xxalwEsw9c2QQeAIftl+Vegovlnee1c9QX4TctnWMn13TZye+giMm8e2LwA==" crossorigin="anonymous" referrerpolicy="no-referrer" />
+{fonts_math}</head>
+<body>
+<div>
+    <div class="{css_class}">
+    '''
+
+_CDN = 'https://cdnjs.cloudflare.com/ajax/libs'
 
+_cdn_scripts = '''    <script src="https://cdnjs.cloudflare.com/ajax/libs/require.js/2.1.10/require.min.js"></script>
+    <script src="https://cdnjs.cloudflare.com/ajax/libs/jquery/2.0.3/jquery.min.js"></script> 
+'''
+
+_cdn_fonts = '''    <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.5.1/css/all.min.css" integrity="sha512-DTOQO9RWCH3ppGqcWaEA1BIZOC6xxalwEsw9c2QQeAIftl+Vegovlnee1c9QX4TctnWMn13TZye+giMm8e2LwA==" crossorigin="anonymous" referrerpolicy="no-referrer" />
+'''
+
+_cdn_math = '''
     <!-- Loading mathjax macro -->
     <!-- Load mathjax -->
     <script src="https://cdnjs.cloudflare.com/ajax/libs/mathjax/2.7.5/latest.js?config=TeX-AMS_HTML"></script>
     <!-- MathJax configuration -->
     <script type="text/x-mathjax-config">
-    MathJax.Hub.Config({{
-        tex2jax: {{
+    MathJax.Hub.Config({
+        tex2jax: {
             inlineMath: [ ["$","$"] ],
             displayMath: [ ["$$","$$"] ],
             processEscapes: true,
             processEnvironments: true
-        }},
+        },
         // align-center justify equations in code and markdown cells. Elsewhere
         // we use CSS to left justify single line equations in code cells.
         displayAlign: "center",
-        "HTML-CSS": {{
-            styles: {{".MathJax_Display": {{"margin": "0.5em auto"}}}},
-            linebreaks: {{ automatic: true }}
-        }}
-    }});
+        "HTML-CSS": {
+            styles: {".MathJax_Display": {"margin": "0.5em auto"}},
+            linebreaks: { automatic: true }
+        }
+    });
     </script>
     <!-- End of mathjax configuration -->
-</head>
-<body>
-<div>
-    <div class="{css_class}">
-    {content}
+'''
+
+# MathML is laid out by browser itself, only spacing is matched to MathJax output
+_static_math_css = '''
+    <style>
+    math[display="block"] { margin: 0.5em auto; }
+    </style>
+'''
+
+# local path -> url, copied to a folder next to html for offline export. MathJax 3 with SVG output 
+# is used offline as it is a single file, MathJax 2 loads dozens of files and fonts at runtime
+vendor_files = {
+    'require.min.js': f'{_CDN}/require.js/2.1.10/require.min.js',
+    'jquery.min.js': f'{_CDN}/jquery/2.0.3/jquery.min.js',
+    'fontawesome/css/all.min.css': f'{_CDN}/font-awesome/6.5.1/css/all.min.css',
+    **{f'fontawesome/webfonts/{name}.woff2': f'{_CDN}/font-awesome/6.5.1/webfonts/{name}.woff2'
+        for name in ('fa-solid-900', 'fa-regular-400', 'fa-brands-400', 'fa-v4compatibility')}, # relative to css
+    'mathjax/tex-svg-full.js': f'{_CDN}/mathjax/3.2.2/es5/tex-svg-full.js',
+}
+
+def _vendor_libs(vendor):
+    return (f'''    <script src="{vendor}/require.min.js"></script>
+    <script src="{vendor}/jquery.min.js"></script> 
+''', f'''    <link rel="stylesheet" href="{vendor}/fontawesome/css/all.min.css" />
+''', f'''
+    <!-- MathJax configuration -->
+    <script>
+    window.MathJax = {{
+        tex: {{
+            inlineMath: [ ["$","$"] ],
+            displayMath: [ ["$$","$$"] ],
+            processEscapes: true,
+            processEnvironments: true
+        }},
+        svg: {{ fontCache: "global", displayAlign: "center" }}
+    }};
+    </script>
+    <script src="{vendor}/mathjax/tex-svg-full.js"></script>
+''')
+
+def doc_tail(script, padding_bottom):
+    "Closes the slides container and document after all sections."
+    return f'''
     </div>
 </div>
 </body>
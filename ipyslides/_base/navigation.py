@@ -14,6 +14,7 @@ class Navigation:
         
         self.btn_prev.on_click(self._shift_left)
         self.btn_next.on_click(self._shift_right)
+        self.widgets.iw.observe(self._frame_switched, names=['_frames'])
         
     def _shift_right(self,change):
         self.widgets.slidebox.remove_class('Prev') # remove backwards animation safely
@@ -29,4 +30,16 @@ class Navigation:
             self.widgets.slidebox.add_class('AnimPrev') # content animation flag, need to stay persistent to avoid trigger removal too early
             if self.wprogress.value > 0:
                 self.wprogress.value = self.wprogress.value - 1 # Backwards
-               
\ No newline at end of file
+               
+
+    def _frame_switched(self, change):
+        "Frames are switched in frontend without waiting for kernel, only progress, on_load etc. are updated here afterwards."
+        slide = self.slides._current
+        if not slide or not slide._fidxs:
+            return
+        nf, index = change.new.get(str(slide.number), (0, slide.indexf))
+        if nf == slide.nf and index != slide.indexf and 0 <= index < nf: # changes from python side are already in place
+            which = 'next' if index > slide.indexf else 'prev'
+            slide._indexf = index
+            slide._update_frames_css() # restores CSS if cleared for print, nothing sent otherwise
+            slide._update_view(which, animate = False)
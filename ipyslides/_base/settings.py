@@ -2,7 +2,7 @@
 Author Notes: Classes in this module should only be instantiated in Slides class or it's parent class
 and then provided to other classes via composition, not inheritance.
 """
-import json, re
+import json, re, datetime
 import traitlets
 
 from traitlets import HasTraits, Int, Unicode, Bool, Float, TraitError
@@ -10,11 +10,14 @@ from pathlib import Path
 from inspect import Signature, Parameter
 from ipywidgets.widgets.trait_types import InstanceDict
 
-from ..formatters import code_css, htmlize
+from ..formatters import code_css, htmlize, _code_themes
+from ..xmd import _content_key
 from ..utils import html, today, _clipbox_children, _resolve_img, get_clips_dir, set_dir
 from . import styles, _layout
 from ..dashlab import disabled
 
+_SLOT_SAFE_RE = re.compile(r'[\w.]*') # slide numbers which markdown leaves as they are
+_SLOTS_RE = re.compile(r'IPSFTR(?:NUM|PV|UNIT)')
 
 class ConfigTraits(HasTraits):
     def _apply_change(self, change=None): raise NotImplementedError
@@ -92,7 +95,7 @@ class Code(ConfigTraits):
     def _apply_change(self, change): # need to set somewhere
         kwargs = {k:v for k,v in self.props.items() if k != 'style_per_theme'}
         kwargs['style'] = getattr(self.style_per_theme, self.main._widgets.theme.value.lower().replace(' ','_'))
-        self.main._widgets.htmls.hilite.value = code_css(**kwargs)
+        self.main._widgets.htmls.hilite.value = code_css(**kwargs) + _code_themes.value # themes of blocks with css_class once per deck
 
 @fix_sig
 class Fonts(ConfigTraits):
@@ -127,6 +130,11 @@ class Footer(ConfigTraits):
     controls = Bool(True, help="Show/hide controls like next/prev buttons and clickers in PDF/export mode.")
     progress = Bool(True, help="Show/hide progress bar at bottom of slides.")
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._parsed = {} # content key of footer template -> parsed html
+        self._dated = (None, '') # (day, html) to parse today's date once a day
+
     def _apply_change(self,change):
         # change is None when called as footer(...), so we update all things together
         self._update_footer() # html content updated
@@ -159,6 +167,11 @@ class Footer(ConfigTraits):
         slide._ftrhtml.value = self._to_html(slide)
 
     
+    def _today(self):
+        if self._dated[0] != (day := datetime.date.today()):
+            self._dated = (day, today(fg = "var(--fg2-color)"))
+        return self._dated[1]
+    
     def _to_html(self, slide=None,fidx=0):
         if slide is None:
             slide = self.main._slides._current
@@ -167,24 +180,39 @@ class Footer(ConfigTraits):
         if self.section and (running := self._running_section_text(slide)):
             inner += (" | " if inner else "") + f"<span class='section'>{running}</span>"
         if self.date:
-            inner += (" | " if inner else "") + f'{today(fg = "var(--fg2-color)") if self.date == "today" else self.date}'
+            inner += (" | " if inner else "") + f'{self._today() if self.date == "today" else self.date}'
         
+        # Numbers are put in placeholders after parsing, so footers of all slides in a section share a single markdown parse
+        slots = {} 
         inner = f'<div class="footer-text"><div>{inner}</div>'
         if self.controls:
             inner += self.main._get_clickers(slide) # clickers in footer when controls on, otherwise in separate div for better print layout
         if self.numbering:
-            inner += f'<div class="slide-number">{slide._disp_num}</div>' # avoid 0 on title page
+            num = slide._disp_num
+            if not _SLOT_SAFE_RE.fullmatch(num): # html hint on empty slides is parsed as is
+                inner += f'<div class="slide-number">{num}</div>' # avoid 0 on title page
+            else:
+                slots['IPSFTRNUM'] = num
+                inner += '<div class="slide-number">IPSFTRNUM</div>'
         inner += '</div>' # complete here
         
         if self.progress:
             pv = self.main._slides._progress_value(slide, fidx)
             if pv is not None: # supplemental otherwise
-                unit = 100/(self.main._slides._lms_idx or 1) # unit progress value per slide
-                pbar = f'<div class="sprogress-view" style="width:{pv}%;height:100%;background:var(--accent-color,blue);" data-cw="{pv}" data-uw="{unit}"></div>' # attributes for JS
+                slots['IPSFTRPV'] = str(pv)
+                slots['IPSFTRUNIT'] = str(100/(self.main._slides._lms_idx or 1)) # unit progress value per slide
+                pbar = '<div class="sprogress-view" style="width:IPSFTRPV%;height:100%;background:var(--accent-color,blue);" data-cw="IPSFTRPV" data-uw="IPSFTRUNIT"></div>' # attributes for JS
                 inner += f'<div class="slide-progress print-only" style="background:var(--bg2-color,#aaa4);width:100%;height:2px;">{pbar}</div>'
         
         inner = re.sub(r'(?<![\`\\])\s*\|\s*', '<span style="white-space:pre;opacity:0.4;"> \u2502 </span>', inner) # replace | with fancy divider before parsing and preserve space around
-        return htmlize(f'<div markdown="1" class="slide-footer" style="{style}">{inner}</div>') 
+        inner = f'<div markdown="1" class="slide-footer" style="{style}">{inner}</div>'
+        if (key := _content_key(inner)) is None: # volatile functions, notebook variables may change in between
+            out = htmlize(inner)
+        elif (out := self._parsed.get(key)) is None:
+            if len(self._parsed) >= 64:
+                self._parsed.clear() # only a few templates are alive at a time, one per running section
+            out = self._parsed[key] = htmlize(inner)
+        return _SLOTS_RE.sub(lambda m: slots[m.group()], out) if slots else out
 
 @fix_sig
 class Layout(ConfigTraits):
@@ -295,6 +323,7 @@ class Settings:
         self._widgets = _instanceWidgets
         self.__class__._instance = self # After _widgets, _slides to enable access
         self.code   = Code()
+        _code_themes._listener = lambda: self.code._apply_change(None)
         self.fonts  = Fonts()
         self.footer = Footer()
         self.layout = Layout()
@@ -309,6 +338,7 @@ class Settings:
         self._widgets.checks.inotes.observe(self._update_theme, names=["value"]) # set inline notes through layout._inotes
         self._widgets.checks.merge.observe(self._set_merge_class, names=["value"])
         self._widgets.buttons.print.on_click(self._print_pdf)
+        self._widgets.iw._callbacks['PRINTED'] = self._restore_frames_css # sent by frontend after print
         self._wslider.observe(self._update_size, names=["value"])
         self._update_theme({'owner':'layout'})  # Trigger Theme with aspect changed as well
         self._update_size(change=None)  # Trigger this as well
@@ -339,6 +369,19 @@ class Settings:
             self._widgets.mainbox.add_class('SlidesMerged')
         else:
             self._widgets.mainbox.remove_class('SlidesMerged')
+        
+        for slide in self._slides: # frames count changes, so stylesheet and frontend frames need update
+            if not getattr(slide, '_frame_idxs', None):
+                continue
+            slide._indexf = min(slide._indexf, slide.nf - 1)
+            if slide._fidxs:
+                slide._update_frames_css()
+            else: # merged into single frame
+                slide._fcss.value = ''
+                slide._sync_frame()
+        
+        if (slide := self._slides._current) and getattr(slide, '_frame_idxs', None):
+            slide._update_view('next', animate=False) # progress and visible part
 
     def _print_pdf(self, btn):
         if self._slides._next_pending:
@@ -364,11 +407,18 @@ class Settings:
             self._widgets.iw.msg_tojs = 'PRINT'
             del self._printingPDF  # remove flag after use
     
+    def _restore_frames_css(self):
+        "Frames CSS is cleared for print, put it back for slides with frames."
+        for slide in self._slides:
+            if slide._fidxs:
+                slide._update_frames_css()
+    
     def _get_clickers(self, slide): # in PDF/export mode
         if len(self._slides) < 5 or slide.number == 0:
             return '' # no clicks for few slides or title page
         
-        items = [getattr(item,'_sec_id','') for item in self._slides if item.index <= self._slides._lms_idx] # only before supplemnetal
+        lms_idx = self._slides._lms_idx # get once, it loops over slides
+        items = [getattr(item,'_sec_id','') for item in self._slides if item.index <= lms_idx] # only before supplemnetal
         imax = len(items) - 1
         items = [items[int(round(i,0))] for i in [0, imax/4,imax/2, 3*imax/4, imax]]
         labels = '●●●●●'
@@ -404,8 +454,9 @@ class Settings:
         self.layout._reflow = self._widgets.checks.reflow.value
         self.layout._inotes = self._widgets.checks.inotes.value
         
-        theme_css = styles.style_css(**self._theme_kws)
-        self._widgets.htmls.theme.value = html("style", theme_css).value
+        theme_kws = self._theme_kws # rules are cached and same value is not sent again, so font size only updates variables
+        self._widgets.htmls.themevars.value = html("style", styles.vars_css(theme_kws['colors'], theme_kws['fonts'])).value
+        self._widgets.htmls.theme.value = html("style", styles.style_css(**theme_kws, _vars = False)).value
         if self._widgets.checks.notes.value:
             self._slides.notes.display() # Update notes window if open
         
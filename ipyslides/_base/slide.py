@@ -2,6 +2,7 @@
 
 import base64
 import textwrap
+from itertools import count
 from contextlib import contextmanager, suppress
 from functools import wraps
 from IPython.display import display
@@ -13,7 +14,7 @@ from ._layout import background_css, get_unique_css_class, loading_skeleton
 from .styles import collapse_node, hide_node
 from ..utils import XTML, html, _resolve_img, _styled_css, _build_css
 from ..xmd import capture_content
-from ..formatters import _Output, widget_from_data, slidebound
+from ..formatters import _Output, widget_from_data, slidebound, _code_themes
 
 class Vars:
     """Container for markdown slide variables, to see and update variables
@@ -60,7 +61,7 @@ class Vars:
         """
         for s in self._slides:
             s._md_vars.update({k:v for k,v in vars.items() if k in s._has_vars}) # only update required vars
-            s._rebuild(True if len(self._slides) == 1 else False) # go there only if single slide
+        self._rebuild()
         
     __call__ = update # allow calling directly like slide.vars(...)
     
@@ -69,14 +70,23 @@ class Vars:
         for s in self._slides:
             for k in vars:
                 s._md_vars.pop(k, None) # avoid key error if not present
-            s._rebuild(True if len(self._slides) == 1 else False) # go there only if single slide
+        self._rebuild()
     
     def clear(self):
         "Clear all variables from a slide or group of slides, so they are picked from higher scopes."
         for s in self._slides:
             s._md_vars.clear()
-            s._rebuild(True if len(self._slides) == 1 else False) # go there only if single slide
+        self._rebuild()
 
+    def _rebuild(self):
+        if len(self._slides) == 1: # go there only if single slide
+            self._slides[0]._app._rebuild_queue.pop(self._slides[0], None)
+            self._slides[0]._rebuild(True)
+        elif self._slides: # current one at once, others in idle time
+            self._slides[0]._app._queue_rebuild(self._slides)
+
+
+_BUILDS = count() # tokens of slide contents
 
 class Specs:
     """Slide configuration specs, can be set as content under slide or outside.
@@ -111,6 +121,7 @@ class Slide:
         self._sec_id = f"s-{id(self)}" # should there alway wether a section or not
         self._md_vars = {} # store variables set by build/rebuild on this slide
         self._esc_vars = {} # store escaped variables for rebuilds form build content
+        self._indexed_vars = () # variables this slide is listed under in app's reverse index, kept across builds
         self._source = {'text': '', 'language': ''} # Should be set at init once, since markdown needs to compare with previous
         self._set_defaults()
         self.vars = Vars(self) # to access variables info and update them
@@ -132,8 +143,11 @@ class Slide:
         self._section = None # Reset sec_key
         self._indexf = 0 # current frame index
         self._contents = [] # reset content to not be exportable 
+        self._build = next(_BUILDS) # unique per contents, never reused unlike id of contents
         self._has_widgets = False # Update in _build_slide function
         self._has_vars = () # Update in _slide function for markdown slides only
+        if self._indexed_vars: # built again, markdown slides are indexed again in _run_mdsrc
+            self._app._index_vars(self)
         self._toc_args = () # empty by default
         self._widget.add_class(f"n{self.number}")
         self._fcss = ipwHTML(layout={"margin": "0","padding": "0","heigh": "0"}) # frame separator CSS
@@ -187,6 +201,7 @@ class Slide:
             self._app._register_postrun_cell()
 
         self._app._auto_rebuild(None) # avoid while building slides to trigger other updates, but keep auto_rebuild state by None
+        _code_themes.release(self) # registered again by code blocks of this build
         
         with self._app._set_running(self):
             with capture_content() as captured:
@@ -206,6 +221,8 @@ class Slide:
             # Clean up delimiters: trailing, empty, adjacent PAUSE delimiters
             self._contents = self._cleanup_delimiters(outputs)
             self._contents.extend(self._handle_refs()) # add at end if any
+            self._build = next(_BUILDS) # contents changed, export does not reuse old sections
+            _code_themes.prune()
             self._set_css_classes(remove = 'Out-Sync') # Now synced
             self.update_display()    
 
@@ -279,8 +296,9 @@ class Slide:
             
         # after others to take everything into account
         self._reset_frames(offset = self._offset)
-        self._app._update_toc()
-        self._app.settings.footer._update_footer() # this is live footer(not print), need to set section and number
+        if not self._app._batching: # done once at end of batch
+            self._app._update_toc()
+            self._app.settings.footer._update_footer() # this is live footer(not print), need to set section and number
         if self is self._app._current: # only on viewed slide, not in background rebuilds
             self._app.run_animation() # inform JS side of reload animation on update/build time without navigation
     
@@ -289,7 +307,8 @@ class Slide:
             return print("Exception: Can only rebuild slides created purely from markdown!")
         
         with self._app.navigate_back(self.index if go_there else None):
-            self._app._slide(f'{self.number} -m', self._markdown)
+            with _build_slide(self._app, self.number): # same as %%slide number -m, but keeps variables set on slide
+                self._app._run_mdsrc(self, self._markdown, **self._md_vars)
             self._app._unregister_postrun_cell() # Avoid showing slides in this rebuild
             self._app._auto_rebuild('ondemand') # set back to previous state as capture removes it
     
@@ -337,6 +356,7 @@ class Slide:
 
     def _reset_frames(self, offset=0):
         self._widget.remove_class('HasFrames') # reset first
+        self._fcss_key = None # frames stylesheet is built again on first frame
         frames, contents = [], self.contents  # get once
         page = {"start": 0, "end": len(contents) - 1} # One legacy page, will be deprecated slowly
         
@@ -359,8 +379,10 @@ class Slide:
         if self._frame_idxs:
             self._widget.add_class('HasFrames') # make sure class is added
             self._reveal_frames() # shows a quick snaphots how frames (were built) will show up 
-        elif hasattr(self, '_frame_idxs'): # from previous run may be
-            del self._frame_idxs
+        else:
+            if hasattr(self, '_frame_idxs'): # from previous run may be
+                del self._frame_idxs
+            self._sync_frame()
         return frames
     
     def _resolve_parts(self, page, contents, indxs):
@@ -464,7 +486,8 @@ class Slide:
         "Number of total frames."
         return len(self._fidxs) or 1 # each slide is single frame
     
-    def _update_view(self, which):
+    def _update_view(self, which, animate = True):
+        "Progress, classes and on_load of a frame switch. Frontend runs animations itself if it switched frame, so `animate = False`."
         self._set_progress()
         getattr(self._app.widgets.slidebox, 
             'remove_class' if which == 'next' else 'add_class'
@@ -479,10 +502,11 @@ class Slide:
             else:
                 self._app._box.remove_class("InView-Last")
         
-        self._app._send_nav_msg(
-            which == 'next',
-            parts = "part" in frame
-        ) # inform JS side
+        if animate:
+            self._app._send_nav_msg(
+                which == 'next',
+                parts = "part" in frame
+            ) # inform JS side
         if any([ # first and last frames are speacial cases, handled by navigation if swicthing from other slide
             self.indexf == 0 and which == 'prev',
             self.indexf + 1 == self.nf and which == 'next',
@@ -562,12 +586,32 @@ class Slide:
                 row_sel = f'{focus_sel}:nth-child({c + 1}) > .jp-OutputArea > .jp-OutputArea-child'
                 css_rules[f'{row_sel}:nth-child(-n + {last_row + 1}):not(:has(.group-header-content))'] = collapse_node(True)
 
-        # Build final CSS with proper selector
-        base_selector = f'^.n{self.number}.HasFrames > .jp-OutputArea > .jp-OutputArea-child'
+        # Build final CSS with proper selector, applies only while frontend shows this frame on slide
+        base_selector = f'^.n{self.number}.HasFrames[data-frame="{index}"] > .jp-OutputArea > .jp-OutputArea-child'
         final_css = {base_selector: css_rules}
     
         return _styled_css(final_css).value
     
+    def _update_frames_css(self):
+        """Set a single stylesheet for all frames of slide, each keyed by a data-frame attribute on slide, and send 
+        frames count with current frame to frontend, which sets that attribute and switches frames without kernel after that. 
+        Stylesheet is built again only when frames or slide number change."""
+        key = (self.number, self._app.widgets.checks.merge.value) # merged frames are different
+        if getattr(self, '_fcss_key', None) != key:
+            self._fcss_all = '\n'.join(self._frame_css(i) for i in range(len(self._fidxs)))
+            self._fcss_key = key
+        self._fcss.value = self._fcss_all # same value is not sent again, restores it after print as well
+        self._sync_frame()
+    
+    def _sync_frame(self):
+        "Update [frames count, current frame] of this slide in frontend, removed if slide has no frames."
+        iw, num = self._app.widgets.iw, str(self.number) # JSON keys
+        if not self._fidxs:
+            if num in iw._frames:
+                iw._frames = {k: v for k, v in iw._frames.items() if k != num}
+        elif iw._frames.get(num) != [self.nf, self.indexf]: # also true when frontend switched it already
+            iw._frames = {**iw._frames, num: [self.nf, self.indexf]}
+    
     def _show_frame(self, which):
         if self._fidxs:
             if (which == 'next') and ((self.indexf + 1) < self.nf):
@@ -577,7 +621,7 @@ class Slide:
             else:
                 return False
             
-            self._fcss.value = self._frame_css(self.indexf)
+            self._update_frames_css()
             self._update_view(which)
             return True # indicators required
         else:
@@ -883,21 +927,24 @@ def _build_slide(app, slide_number):
         app._slides_dict[slide_number] = this
         app.refresh() # rebuild slides to have index ready
        
-    this._waiting_contents(f'Building Slide {this.number} ...') # show loading skeleton
-    app.navigate_to(this.index) # go and see the slide being built
+    if not app._batching: # a batch is shown once at end, not slide by slide
+        this._waiting_contents(f'Building Slide {this.number} ...') # show loading skeleton
+        app.navigate_to(this.index) # go and see the slide being built
+    
     with this._capture(): 
         yield this
         this._exec_src()  # if markdown src was set, a complete overwrite of the slide content is performed
-        
-    app.widgets.iw.msg_tojs = 'SwitchView' # enforce immediate view cleanup to avoid overlapping slides content
+    
     for content in this._contents:
         if content.data.get('application/vnd.jupyter.widget-view+json',{}):
             this._has_widgets = True
             break # No need to check other widgets if one exists
     
-    this._update_transition_objs() # any animation/CSS etc set during build should be applied immediately
-    this._set_progress() # update progress bar after each build
-    app.settings.footer._update_footer() # update footer after each build
+    if not app._batching: # Slides._batch_build does these once at end
+        app.widgets.iw.msg_tojs = 'SwitchView' # enforce immediate view cleanup to avoid overlapping slides content
+        this._update_transition_objs() # any animation/CSS etc set during build should be applied immediately
+        this._set_progress() # update progress bar after each build
+        app.settings.footer._update_footer() # update footer after each build
     
 class SlideGroup:
     """Proxy calls/attributes to multiple Slide instances.
@@ -423,6 +423,8 @@ function printSlides(box, model) {
     function afterPrintHandler() {
         cleanupAfterPrint();
         window.removeEventListener('afterprint', afterPrintHandler);
+        model.set("msg_topy", "PRINTED"); // restore frames CSS in kernel
+        model.save_changes();
     }
     
     cleanupBtn.onclick = afterPrintHandler;
@@ -474,8 +476,10 @@ function keyboardEvents(box,model) {
         } else if (key === 'End') { // Jump to last main slide (before extra slides)
             message = 'LAST';
         } else if (key === 'ArrowLeft' || key === '-') { // -, <
+            if (switchFrame(box, model, false)) return true; // frame switched without kernel
             message = 'PREV';
         } else if (key === 'ArrowRight' || key === '+' || key === ' ') { // Space, +,  >
+            if (switchFrame(box, model, true)) return true;
             message = 'NEXT';
         } else if (key in keyMessage && !e.ctrlKey){
             message = keyMessage[key];
@@ -501,6 +505,43 @@ function toggleFS(box) {
     }
 }
 
+function applyFrames(box, model) {
+    // Set current frame of each slide as data-frame attribute, frames CSS of slide is keyed by it
+    const frames = model.get('_frames') || {};
+    for (const [num, [nf, index]] of Object.entries(frames)) {
+        box.querySelectorAll(`:scope .SlideArea.n${num}`).forEach(slide => {
+            if (slide.getAttribute('data-frame') !== String(index)) { slide.setAttribute('data-frame', index); }
+        });
+    }
+}
+
+function switchFrame(box, model, forward) {
+    // Switch frame of current slide in frontend and let python know afterwards, returns false if there is no frame in that direction
+    const slide = box.querySelector(':scope .SlideArea.ShowSlide');
+    if (!slide || !slide.classList.contains('HasFrames')) return false;
+    const num = [...slide.classList].find(cls => /^n\d+$/.test(cls))?.slice(1);
+    const frames = model.get('_frames') || {};
+    if (!num || !Array.isArray(frames[num])) return false;
+
+    const [nf, index] = frames[num];
+    const next = index + (forward ? 1 : -1);
+    if (next < 0 || next >= nf) return false; // slide switch is done by python
+
+    model.set('_frames', {...frames, [num]: [nf, next]});
+    model.save_changes(); // python updates progress and runs on_load whenever kernel is free
+    applyFrames(box, model);
+    box.querySelector(':scope .SlideBox')?.classList.toggle('AnimPrev', !forward); // python sets it later too
+    handleMessage(model, forward ? "NAV:RIGHT/PARTS" : "NAV:LEFT/PARTS", box);
+    return true;
+}
+
+function navigate(box, model, forward) {
+    if (!switchFrame(box, model, forward)) {
+        model.set("msg_topy", forward ? "NEXT" : "PREV");
+        model.save_changes();
+    }
+}
+
 function runLinearReveal(model, box, steps, stepMs = 140) {
     if (!Number.isFinite(steps) || steps <= 0) return;
 
@@ -514,8 +555,7 @@ function runLinearReveal(model, box, steps, stepMs = 140) {
 
     for (let i = 0; i < steps; i++) {
         const timer = setTimeout(() => {
-            model.set("msg_topy", "NEXT");
-            model.save_changes();
+            navigate(box, model, true);
         }, (i + 1) * intervalMs);
         box._revealTimers.push(timer);
     }
@@ -530,6 +570,7 @@ function handleMessage(model, msg, box) {
         const steps = parseInt(msg.split(":")[1], 10) || 0;
         runLinearReveal(model, box, steps);
     } else if (msg === "SwitchView") {
+        applyFrames(box, model); // slides built or displayed after last change of frames
         let slideNew = box.querySelector(":scope .SlideArea.ShowSlide");
         slideNew.style.visibility = 'visible';
         slideNew.querySelector(':scope .jp-OutputArea').scrollTop = 0; // scroll reset is important
@@ -801,8 +842,7 @@ function handlePointerSwipe(box, model) {
         }
 
         if (Math.abs(diffX) >= THRESHOLD_SWIPE) {
-            model.set("msg_topy", diffX < 0 ? "NEXT" : "PREV");
-            model.save_changes();
+            navigate(box, model, diffX < 0);
             swiped = true; // Only one navigation per gesture
         }
     });
@@ -986,7 +1026,7 @@ function displaySplash(box) {
 
 function render({ model, el }) {
     // Store listener references for cleanup
-    const listeners = { msgToJs: null, msgCustom: null};
+    const listeners = { msgToJs: null, msgCustom: null, frames: null};
 
     let style = document.createElement('style');
     //  Trick to get main slide element is to wait for a loadable element
@@ -1054,6 +1094,11 @@ function render({ model, el }) {
         };
         model.on("change:msg_tojs", listeners.msgToJs);
 
+        // Frames set from python side, e.g. by buttons or on slide switch
+        listeners.frames = () => { applyFrames(box, model); };
+        model.on("change:_frames", listeners.frames);
+        applyFrames(box, model);
+
         // Handle notifications
         listeners.msgCustom = (msg) => {
             if (document.hasFocus() && !document.hidden) { // only if document is in view of user
@@ -1090,6 +1135,7 @@ function render({ model, el }) {
             console.log("Cleaning up view:", box.getAttribute("uid"));
             if (listeners.msgToJs) model.off("change:msg_tojs", listeners.msgToJs);
             if (listeners.msgCustom) model.off("msg:custom", listeners.msgCustom);
+            if (listeners.frames) model.off("change:_frames", listeners.frames);
             if (box._resObs) {
                 box._resObs.disconnect();
                 delete box._resObs;
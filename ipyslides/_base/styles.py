@@ -344,15 +344,32 @@ def _safe_height(aspect):
     """
     return round(210 / aspect, 2) + 0.001
 
-def style_css(colors, fonts, layout, _root = False):
-    uclass = get_unique_css_class()
+def vars_css(colors, fonts, _root = False):
+    "CSS custom properties of theme, which are cheap to build and change often, e.g. font size by slider."
     _root_dict = {**{f"--{k}-color":v for k,v in colors.items()}, # Only here change to CSS variables
         '--text-size':f'{fonts.size}px',
         '--jp-content-font-family': f'{fonts.text}, -apple-system, "BlinkMacSystemFont", "Segoe UI", "Oxygen", "Ubuntu", "Cantarell", "Open Sans", "Helvetica Neue", "Icons16"',
         '--jp-code-font-family': f'{fonts.code}, "Ubuntu Mono", "SimSun-ExtB", "Courier New"',
     }
+    return _build_css(() if _root else (get_unique_css_class(),), _root_dict if not _root else {':root': _root_dict})
+
+_STYLE_CACHE = {} # (uclass, colors, heading font, layout, _root) -> CSS, a session switches among a few of these
+_LAYOUT_KEYS = ('centered', 'scroll', 'width', 'aspect', 'ncol_refs', '_reflow', '_inotes')
+
+def style_css(colors, fonts, layout, _root = False, _vars = True):
+    """Theme CSS for given colors, fonts and layout. Rules are built once per combination of settings they depend on,
+    and custom properties from `vars_css` are added in front unless `_vars = False`, so those can be updated separately."""
+    uclass = get_unique_css_class()
+    key = (uclass, tuple(colors.items()), fonts.heading, tuple(getattr(layout, k) for k in _LAYOUT_KEYS), _root)
+    if (css := _STYLE_CACHE.get(key)) is None:
+        if len(_STYLE_CACHE) >= 32:
+            _STYLE_CACHE.clear()
+        css = _STYLE_CACHE[key] = _rules_css(uclass, colors, fonts, layout, _root)
+    return vars_css(colors, fonts, _root) + css if _vars else css
+
+def _rules_css(uclass, colors, fonts, layout, _root):
+    "Rules of theme, only `fonts.heading` is used from fonts here, others are in `vars_css`."
     return _build_css(() if _root else (uclass,),{ # uclass is not used in root for exporting purpose
-        **(_root_dict if not _root else {':root': _root_dict}),
         '^.SlidesWrapper, .jupyter-widgets, .jp-RenderedHTMLCommon': { # widgets have their own fonts, but make same
             'font-family': 'var(--jp-content-font-family) !important',
             'color': 'var(--fg1-color)', # important to put here for correct export
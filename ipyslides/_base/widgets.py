@@ -312,6 +312,7 @@ class _Htmls:
     """
     footer  = HTML(layout=Layout(margin='0')).add_class('FooterArea') # Zero margin is important
     theme   = HTML()
+    themevars = HTML() # CSS variables of theme, updated without theme rules
     usercss = HTML() # Persistent user CSS mount for overall + all per-slide styles
     main    = HTML() 
     logo    = HTML().add_class('LogoHtml') # somehow my defined class is not behaving well in this case
@@ -380,6 +381,7 @@ class Widgets:
         
         self.mainbox = VBox([ 
             self.htmls.main,
+            self.htmls.themevars,
             self.htmls.theme,
             self.htmls.usercss,
             self.iw,
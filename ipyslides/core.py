@@ -1,5 +1,6 @@
-import shutil, inspect
+import shutil, inspect, traceback, asyncio
 import sys, json, re, math, textwrap
+import pickle, hashlib, weakref, types
 import yaml
 from contextlib import contextmanager, suppress
 from collections.abc import Iterable
@@ -43,6 +44,117 @@ def docs():
     shutil.copy(Path(__file__).with_name('pkg_nbs') / 'ips-docs.ipynb', docs_dir)
     utils.html('a','Open Documentation Notebook', href='_ipsDocs/ips-docs.ipynb', target='_blank').display()
 
+_DIGEST_LIMIT = 1 << 20 # bytes, larger data is compared by identity as digesting it after every cell would be slow
+_CELL_LIMIT = 8 << 20 # bytes digested for all variables after a cell, rest are compared by identity
+_ITEMS_LIMIT = 10_000 # containers with more items are compared by identity
+
+def _digest(data):
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+class _TooLarge(Exception): pass
+
+class _Budget:
+    "Bytes left to digest for fingerprints after a cell, so total work per cell is bounded, not only per variable."
+    def __init__(self, size = _CELL_LIMIT):
+        self.left = size
+    
+    @property
+    def limit(self):
+        return max(min(_DIGEST_LIMIT, self.left), 0)
+    
+    def spend(self, size):
+        self.left -= size
+
+class _DigestWriter:
+    "File-like sink for pickle which digests written bytes and stops after `limit`, so nothing large is built in memory."
+    def __init__(self, limit = _DIGEST_LIMIT):
+        self.hash = hashlib.blake2b(digest_size=16)
+        self.size = 0
+        self.limit = limit
+    
+    def write(self, data):
+        self.size += len(data)
+        if self.size > self.limit:
+            raise _TooLarge
+        self.hash.update(data)
+        return len(data)
+
+class _Identity:
+    """Identity of an object which does not keep it alive. Equal only for same living object. Objects which can not be 
+    weakly referenced (list, dict etc.) keep type and length to compare as well, because their id can be reused."""
+    __slots__ = ('id', 'ref', 'sig')
+    def __init__(self, obj):
+        self.id, self.ref, self.sig = id(obj), None, type(obj)
+        try:
+            self.ref = weakref.ref(obj)
+        except TypeError:
+            with suppress(Exception):
+                self.sig = (type(obj), len(obj))
+    
+    @property
+    def exact(self):
+        "Whether equality means same object, not only same id, which needs a living weak reference."
+        return self.ref is not None
+    
+    def __eq__(self, other):
+        if not isinstance(other, _Identity) or self.id != other.id or self.sig != other.sig:
+            return False
+        if self.ref is None or other.ref is None:
+            return self.ref is other.ref
+        return self.ref() is not None and self.ref() is other.ref() # dead referent means id may be reused
+    
+    __hash__ = None
+
+def _var_fingerprint(value, keys, budget = None):
+    """Comparable snapshot of a notebook variable for auto rebuild, which does not hold its data. 
+    Uses registered key functions first, see `Slides.rebuild_key`. Only small data is digested, large objects 
+    are compared by identity (and `__version__`, shape if available), so checking after every cell stays cheap.
+    If a `_Budget` is given, digested bytes are taken from it and data beyond it is compared by identity."""
+    for cls in type(value).__mro__:
+        if cls in keys:
+            return ('key', keys[cls](value))
+    
+    if value is None or isinstance(value, (bool, int)):
+        return ('value', type(value), value)
+    if isinstance(value, (float, complex)):
+        return ('value', type(value), repr(value)) # nan is not equal to itself
+    if (version := getattr(value, '__version__', None)) is not None:
+        return ('version', _Identity(value), version)
+    if isinstance(value, (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType)):
+        return ('id', _Identity(value)) # pickled by name, so redefinition is only seen by identity
+    
+    budget = budget or _Budget(_DIGEST_LIMIT)
+    if isinstance(value, (str, bytes)):
+        if len(value) > budget.limit:
+            return ('id', _Identity(value)) # immutable, so identity is exact
+        budget.spend(len(value))
+        return ('digest', type(value), _digest(value if isinstance(value, bytes) else value.encode('utf-8', 'surrogatepass')))
+    if all(hasattr(value, a) for a in ('tobytes', 'shape', 'dtype')): # numpy arrays and alike, no elementwise comparison
+        with suppress(Exception):
+            if (nbytes := getattr(value, 'nbytes', None)) is None or nbytes > budget.limit: # views are copied by tobytes too
+                return ('array', _Identity(value), str(value.dtype), value.shape)
+            budget.spend(nbytes)
+            return ('buffer', type(value), str(value.dtype), value.shape, _digest(value.tobytes()))
+    if (pd := sys.modules.get('pandas')) and isinstance(value, (pd.Series, pd.DataFrame, pd.Index)):
+        with suppress(Exception): # unhashable cells fall through
+            usage = value.memory_usage(deep=False)
+            if (nbytes := int(usage.sum() if hasattr(usage, 'sum') else usage)) > budget.limit:
+                return ('pandas', _Identity(value), value.shape)
+            budget.spend(nbytes)
+            return ('pandas', type(value), _digest(repr(getattr(value, 'columns', None)).encode()), _digest(pd.util.hash_pandas_object(value).values.tobytes()))
+    with suppress(Exception):
+        if len(value) > _ITEMS_LIMIT:
+            return ('id', _Identity(value))
+    
+    writer = _DigestWriter(budget.limit)
+    try: # pickling stops as soon as it gets large
+        pickle.Pickler(writer, protocol=pickle.HIGHEST_PROTOCOL).dump(value)
+        return ('pickle', type(value), writer.hash.digest())
+    except Exception:
+        return ('id', _Identity(value))
+    finally:
+        budget.spend(writer.size)
+
 class _Citation:
     "Add citation to the slide with a unique key and value."
 
@@ -177,7 +289,12 @@ class Slides(BaseSlides,metaclass=Singleton):
         self._next_number = 0  # Auto numbering of slides should be only in python scripts
         self._citations = {}  # Initialize citations dictionary
         self._slides_per_cell = [] # all buidling slides in a cell will be added while capture, and removed with post run cell
-        self._last_vars = {} # will be handled by a post run cell
+        self._last_vars = {} # identities and fingerprints of notebook variables, handled by a post run cell
+        self._rebuild_keys = {} # type -> key function, see rebuild_key
+        self._var_slides = {} # variable name -> markdown slides using it, updated in _run_mdsrc
+        self._batching = False # deck-wide updates are deferred while building many slides at once
+        self._rebuild_queue = {} # markdown slides waiting for rebuild in idle time, ordered and unique
+        self._rebuild_task = None
 
         self._set_saved_citations() # from previous session
         self.wprogress = self.widgets.sliders.progress
@@ -261,9 +378,26 @@ class Slides(BaseSlides,metaclass=Singleton):
     @property
     def _nb_vars(self): # variables from notebook scope, not set by build/rebuild
         # Keep this as property, as any pop out from rebuild will be picked at latest
-        keys = [k for s in self.markdown_slides for k in s._req_vars] # All markdown slides vars names
         user_ns = get_main_ns() # works both in top running module and notebook
-        return {k: user_ns[k] for k in keys if k in user_ns} # avoid undefined variables
+        return {k: user_ns[k] for k, slides in self._var_slides.items() if slides and k in user_ns} # avoid undefined variables
+    
+    def _index_vars(self, slide, names = ()):
+        "Put `slide` under variable `names` in reverse index, dropping its old names. Names left without slides are removed."
+        for v in set(slide._indexed_vars).difference(names):
+            if (slides := self._var_slides.get(v)) is not None:
+                slides.discard(slide)
+                if not slides:
+                    del self._var_slides[v]
+        for v in names:
+            self._var_slides.setdefault(v, set()).add(slide)
+        slide._indexed_vars = tuple(names)
+    
+    def _var_dependents(self, key):
+        "Markdown slides in deck which pick variable `key` from notebook scope."
+        slides = self._var_slides.get(key, set())
+        for s in [s for s in slides if self._slides_dict.get(s.number) is not s]:
+            slides.discard(s) # removed from deck
+        return [s for s in slides if s._markdown and key in s._req_vars] # not set on slide or rebuilt from python
     
     def _auto_rebuild(self, change):
         # Enable/Disable automatic rebuilding of markdown slides after each cell execution to update variables.
@@ -281,15 +415,105 @@ class Slides(BaseSlides,metaclass=Singleton):
         if result.error_before_exec or result.error_in_exec:
             return  # Do not proceed for side effects
         
-        new_vars = self._nb_vars # latest
-        diff = {key:value for key, value in new_vars.items() if not (key in self._last_vars)} # diff operator ^ can only work for hashable types
-        diff.update({key:value for key, value in new_vars.items() if value != self._last_vars.get(key,None)}) 
-        if diff:
-            self._last_vars.update(new_vars) # update to compare next time
-            with self.navigate_back():
-                for slide in self.markdown_slides: 
-                    if diff.keys() & slide._req_vars: # Intersection of keys
-                        slide._rebuild(True)
+        changed, budget = [], _Budget() # total digest work per cell is bounded
+        for key in self._last_vars.keys() - self._var_slides.keys():
+            del self._last_vars[key] # no slide uses it anymore
+        
+        for key, value in self._nb_vars.items(): # latest
+            ident, last = _Identity(value), self._last_vars.get(key)
+            if last and ident.exact and ident == last[0] and not self._keyed(value):
+                continue # same object as last time, its content is not hashed again
+            fp = _var_fingerprint(value, self._rebuild_keys, budget)
+            self._last_vars[key] = (ident, fp) # only identity and fingerprint are kept to compare next time
+            if not last or self._fp_changed(fp, last[1]):
+                changed.append(key)
+        
+        if changed: # only slides depending on changed variables
+            slides = {s for key in changed for s in self._var_dependents(key)}
+            self._queue_rebuild(sorted(slides, key=lambda s: s.index or 0))
+    
+    def _keyed(self, value):
+        "Whether change of value is checked by a registered key or `__version__` even if it is same object."
+        return hasattr(value, '__version__') or any(cls in self._rebuild_keys for cls in type(value).__mro__)
+    
+    @staticmethod
+    def _fp_changed(new, old):
+        try:
+            return bool(new != old)
+        except Exception: # a user key may be ambiguous as bool
+            return True
+    
+    def rebuild_key(self, obj_type, func=None):
+        """Register a key function to detect changes in notebook variables of `obj_type` for `Auto Rebuild` of markdown slides.
+        Can be used as a decorator. The key should be cheap to compute and compare, like a version counter or some metadata.
+        
+        ```python
+        @slides.rebuild_key(Model)
+        def model_key(model):
+            return (model.name, model.step) # rebuild only when these change
+        ```
+        
+        Without a registered key, a variable still bound to the same object is taken as unchanged, unless it has a `__version__`.
+        A newly bound value is compared with the old one: numbers by value, objects with a `__version__` by identity and that version, 
+        and small strings, arrays, pandas objects and other picklable objects by a digest of their content (at most 8 MB in total per cell).
+        Large objects (over 1 MB or 10,000 items) and others are compared by identity only, so in-place changes need a key function.
+        Old values are never kept, so large data is not compared elementwise or held in memory twice.
+        """
+        if func is None:
+            return lambda func: self.rebuild_key(obj_type, func)
+        
+        if not isinstance(obj_type, type):
+            raise TypeError(f"obj_type should be a class, got {obj_type!r}")
+        if not callable(func):
+            raise TypeError(f"func should be callable, got {func!r}")
+        
+        self._rebuild_keys[obj_type] = func
+        return func
+    
+    def _queue_rebuild(self, slides):
+        """Rebuild current slide at once, others are queued for idle time on event loop. 
+        A slide already in queue is rebuilt only once, with latest variables at that time."""
+        slides = [s for s in slides if s._markdown]
+        if (cur := self._current) in slides: # viewed slide first
+            slides.remove(cur)
+            self._rebuild_queue.pop(cur, None)
+            cur._rebuild(True)
+        
+        self._rebuild_queue.update(dict.fromkeys(slides))
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError: # not in kernel, e.g. a python script
+            return self._flush_rebuilds()
+        
+        if self._rebuild_queue and (self._rebuild_task is None or self._rebuild_task.done()):
+            self._rebuild_task = loop.create_task(self._run_rebuilds())
+    
+    async def _run_rebuilds(self):
+        while self._rebuild_queue:
+            await asyncio.sleep(0.1 if self.this else 0) # kernel handles messages and cells in between, never interleave with a slide being built
+            if self._rebuild_queue and not self.this:
+                self._rebuild_next()
+    
+    def _rebuild_next(self, slide=None):
+        "Rebuild given or next queued slide without navigation, current slide is preferred."
+        if slide is None:
+            slide = self._current if self._current in self._rebuild_queue else next(iter(self._rebuild_queue))
+        self._rebuild_queue.pop(slide, None)
+        if self._slides_dict.get(slide.number) is not slide: 
+            return # removed or replaced while waiting
+        
+        try:
+            with self._batch_build():
+                slide._rebuild(False)
+        except Exception:
+            e, text = traceback.format_exc(limit=0).split(':',1) # only get last error for notification
+            slide._widget.append_display_data(utils.error(e, text)) # stays on slide until it is built again
+            self.notify(f"{utils.error('RebuildError',f'slide {slide.number} could not be rebuilt')}<br/>{utils.error(e,text)}",20)
+    
+    def _flush_rebuilds(self):
+        "Rebuild all queued slides now, e.g. before export."
+        while self._rebuild_queue:
+            self._rebuild_next()
     
     def _post_run_cell(self, result):
         self._auto_rebuild('ondemand') # keep auto_rebuild state, but register if needed
@@ -408,6 +632,33 @@ class Slides(BaseSlides,metaclass=Singleton):
         finally:
             self.navigate_to(old_index)
 
+    @contextmanager
+    def _batch_build(self):
+        "Build many slides at once, deferring navigation, toc and footer updates to a single pass at end."
+        if self._batching: # nested batch is part of outer one
+            yield
+            return
+        
+        sections = [(s.number, s._section) for s in self[:]]
+        self._batching, self._batch_sections = True, False
+        try:
+            yield
+        finally:
+            self._batching = False
+            if self._batch_sections and sections != [(s.number, s._section) for s in self[:]]:
+                self.widgets.iw._main_end = self._lms_idx # need for frontend
+                for s in self[:]:
+                    self.settings.footer._set_on(s) # update all slides footer to reflect correct sections
+                    if s._toc_args:
+                        s.update_display()
+            
+            self._update_toc()
+            self.settings.footer._update_footer()
+            self.widgets.iw.msg_tojs = 'SwitchView' # enforce immediate view cleanup to avoid overlapping slides content
+            if self._current:
+                self._current._update_transition_objs()
+                self.navigate_to(self._current.index) # keeps progress and visibility in sync
+    
     @property
     def version(self):
         "Get Slides version."
@@ -480,6 +731,7 @@ class Slides(BaseSlides,metaclass=Singleton):
                 slide._citations.clear() # Break circular references
                 slide._widget.outputs = () # clear output to free visual clutter
                 slide._contents = [] # clear contents to free memory
+                self._index_vars(slide) # removed from reverse index of variables
                 if hasattr(slide, '_src_func'): del slide._src_func
                 if hasattr(slide, '_scroll_btn'): del slide._scroll_btn
         
@@ -614,6 +866,10 @@ class Slides(BaseSlides,metaclass=Singleton):
         if supplemental:
             self.this._is_supp = True # make on slide, not outside to make correct when slide get deleted
         
+        if self._batching:
+            self._batch_sections = True # footers and toc slides are updated once at end of batch
+            return
+        
         self.widgets.iw._main_end = self._lms_idx # need for frontend
         
         for s in self[:]:
@@ -776,6 +1032,8 @@ class Slides(BaseSlides,metaclass=Singleton):
             self.notes.display()  # Display notes first
             self.notify('x') # clear notification
             self._switch_slide(old_index=change["old"], new_index=change["new"])
+            if self._current in self._rebuild_queue: # navigated before its turn in idle time
+                self._rebuild_next(self._current)
             self._current._run_on_load()  # Run on_load setup after switching slide, it updates footer as well
     
     def _send_nav_msg(self, forward=True, parts=False, selector=None):
@@ -897,6 +1155,7 @@ class Slides(BaseSlides,metaclass=Singleton):
         cvars = _matched_vars(content) # update has_vars before running to have ready for auto rebuild
         stored = {**esc._store, **slide._esc_vars} # keep previous stored variables, first time come only from esc._store
         slide._has_vars = tuple([v for v in cvars if v not in stored]) # esc is encapsulated by design
+        self._index_vars(slide, slide._has_vars) # reverse index for auto rebuild
         slide._esc_vars = {v: stored[v] for v in cvars if v in stored} # store for rebuilds internally
         slide._md_vars = {k:v for k,v in vars.items() if k in cvars} # store user given markdown variables
         # parse and display content after setting source and preparing variables
@@ -2,10 +2,11 @@
 
 """
 import sys
+import weakref
 import textwrap
 import inspect, re, base64
 
-from functools import wraps
+from functools import wraps, lru_cache
 from pprint import PrettyPrinter
 from io import BytesIO
 from contextlib import contextmanager
@@ -256,6 +257,46 @@ def _focus_on(html_str, self=True): # Focus for auto output, self or child
     return f'<div class="focus-{klass}">{html_str}</div>'
 
 
+@lru_cache(maxsize = None)
+def _all_styles():
+    "Names of pygments styles, enumerating plugin entry points is slow, so done once."
+    return tuple(pygments.styles.get_all_styles())
+
+def _check_style(style):
+    if style not in _all_styles():
+        raise KeyError(f"Style {style!r} not found in {list(_all_styles())}")
+
+@lru_cache(maxsize = 64)
+def _lexer(language):
+    return pygments.lexers.get_lexer_by_name(language) # lexers keep no state between highlights
+
+@lru_cache(maxsize = 64)
+def _formatter(style):
+    return pygments.formatters.HtmlFormatter(style = style)
+
+@lru_cache(maxsize = 256)
+def _style_defs(style, _class):
+    "Pygments style rules for given selector with its own (background, color) if any."
+    _style = _formatter(style).get_style_defs(_class)
+    if style == 'default':
+        return _style, {'background': 'var(--bg2-color)', 'color': 'var(--fg1-color)'} # Should match inherit theme
+    
+    _bg_fg = {} # Override color and background if provided by theme
+    items = [b.strip().split() for b in ''.join(re.findall(rf'{_class}\s+?{{(.*?)}}',_style)).replace(':',' ').rstrip(';').split(';')]
+    for item in items:
+        if len(item) == 2 and item[0] in ('background','color'):
+            _bg_fg[item[0]] = item[1]
+    return _style, _bg_fg
+
+@lru_cache(maxsize = 512)
+def _highlighted(code, language, style):
+    "Pygments output split as (start, lines wrapped in <code>, end). Same code in a deck is highlighted once across rebuilds."
+    _code = pygments.highlight(code, _lexer(language), _formatter(style))
+    start, mid_end = _code.split('<pre>')
+    middle, end = mid_end.split('</pre>')
+    lines = middle.strip().replace('<span></span>','').splitlines()
+    return start, '\n' + '\n'.join([f'<code>{line}</code>' for line in lines]), end # start with newline is important
+
 def code_css(style='default',color = None, background = None, hover_color = 'var(--bg3-color)', css_class = None, lineno = True):
     """Style code block with given style from pygments module. ` color ` and ` background ` are optional and will be overriden if pygments style provides them.
     """
@@ -263,17 +304,8 @@ def code_css(style='default',color = None, background = None, hover_color = 'var
     if lineno:
         _class += '.numbered'
     
-    if style not in pygments.styles.get_all_styles():
-        raise KeyError(f"Style {style!r} not found in {list(pygments.styles.get_all_styles())}")
-    _style = pygments.formatters.HtmlFormatter(style = style).get_style_defs(_class)
-    if style == 'default':
-        _bg_fg = {'background': 'var(--bg2-color)', 'color': 'var(--fg1-color)'} # Should match inherit theme
-    else: # Override color and background if provided by theme
-        _bg_fg = {} 
-        items = [b.strip().split() for b in ''.join(re.findall(rf'{_class}\s+?{{(.*?)}}',_style)).replace(':',' ').rstrip(';').split(';')]
-        for item in items:
-            if len(item) == 2 and item[0] in ('background','color'):
-                _bg_fg[item[0]] = item[1]      
+    _check_style(style)
+    _style, _bg_fg = _style_defs(style, _class)
     
     # keep user preferences               
     bg = background if background else _bg_fg.get('background','var(--bg2-color)')
@@ -304,24 +336,74 @@ def code_css(style='default',color = None, background = None, hover_color = 'var
         display:{'inline-block' if lineno else 'none'} !important;
     }}\n</style>"""
 
+class _CodeThemes:
+    """Stylesheets of highlighted code blocks by their `code_css` arguments, each kept once alongside `widgets.htmls.hilite`
+    while a deck exists. Blocks built in a slide only carry their class, others carry their own style as well, as they may 
+    be shown outside deck. Themes not used by any slide after a build are dropped, unless used outside slide builds."""
+    def __init__(self):
+        self._sheets = {} # code_css kwargs -> style
+        self._users = {} # code_css kwargs -> slides using it
+        self._kept = set() # code_css kwargs used outside slide builds, never dropped
+        self._log = [] # kwargs registered in current build, reused by parse cache of markdown
+        self._listener = None # set by settings of slides
+    
+    @property
+    def inline(self):
+        "Whether blocks carry their own style, which is outside slide builds."
+        return self._listener is None or getattr(get_slides_instance(), 'this', None) is None
+    
+    def __call__(self, **kwargs):
+        "Style to put with a code block, empty if it is registered with slide being built."
+        if self._listener is None: # no deck
+            return code_css(**kwargs)
+        key = tuple(kwargs.items())
+        self.register(key)
+        return self._sheets[key] if self.inline else ''
+    
+    def register(self, *keys):
+        "Register themes for slide being built or outside builds, listener is called only on a new combination, not for every block."
+        slide, new = getattr(get_slides_instance(), 'this', None), False
+        for key in keys:
+            if key not in self._sheets:
+                self._sheets[key] = code_css(**dict(key))
+                new = True
+            if slide is None:
+                self._kept.add(key)
+            else:
+                self._users.setdefault(key, weakref.WeakSet()).add(slide) # deleted slides go away
+                self._log.append(key)
+        if new:
+            self._listener()
+    
+    def release(self, slide):
+        "Forget themes of a slide before it is built again."
+        self._log.clear()
+        for users in self._users.values():
+            users.discard(slide)
+    
+    def prune(self):
+        "Drop themes of slide builds not used by any slide."
+        if stale := [key for key, users in self._users.items() if not users and key not in self._kept]:
+            for key in stale:
+                del self._sheets[key], self._users[key]
+            self._listener()
+    
+    @property
+    def value(self):
+        return '\n'.join(self._sheets.values())
+
+_code_themes = _CodeThemes()
+
 def _highlight(code, language='python', name = None, css_class = None, style='default', color = None, background = None, hover_color = 'var(--bg3-color)', lineno = True, height='400px'):
-    if style not in pygments.styles.get_all_styles():
-        raise KeyError(f"Style {style!r} not found in {list(pygments.styles.get_all_styles())}")
-    if css_class in pygments.styles.get_all_styles():
+    _check_style(style)
+    if css_class in _all_styles():
         style = css_class
     
     if not isinstance(code, str):
         code = _source_code(code)
         
-    formatter = pygments.formatters.HtmlFormatter(style = style)
-    _style = code_css(style=style, color = color, background = background, hover_color = hover_color,css_class=css_class, lineno = lineno) if css_class else ''
-    _code = pygments.highlight(textwrap.dedent(code).strip('\n'), # dedent make sure code blocks at any level are picked as well
-            pygments.lexers.get_lexer_by_name(language), formatter)
-    
-    start, mid_end = _code.split('<pre>')
-    middle, end = mid_end.split('</pre>')
-    lines = middle.strip().replace('<span></span>','').splitlines()
-    code_ = '\n' + '\n'.join([f'<code>{line}</code>' for line in lines]) # start with newline is important
+    _style = _code_themes(style=style, color = color, background = background, hover_color = hover_color,css_class=css_class, lineno = lineno) if css_class else ''
+    start, code_, end = _highlighted(textwrap.dedent(code).strip('\n'), language, style) # dedent make sure code blocks at any level are picked as well
     _title = '' if name is False else name if name else language.title()
     
     _class = (css_class if isinstance(css_class, str) else '') + (' numbered' if lineno else '')
@@ -288,7 +288,7 @@ def _resolve_img(src, width):
                 return _resolve_img(SVG(src)._repr_svg_(), width=width)
     return ''
 
-_internal_xmd_call('code')(code) # Register code class for xmd usage
+_internal_xmd_call('code', volatile=True)(code) # Register code class for xmd usage, volatile as it can read files
 
 @_internal_xmd_call('details')
 def details(obj,summary='Click to show content', name=None, opened=False, **css_props):
@@ -327,7 +327,7 @@ def _crop_image(image, bbox):
     bbox = [int(round(b*x,0)) for b,x in zip(bbox, [w,h,w,h])] # Convert to pixel values to nearest integer
     return image.crop(bbox)
 
-@_internal_xmd_call('image')    
+@_internal_xmd_call('image', volatile=True)
 def image(data=None,width='95%',caption=None, crop = None, css_props={}, css_class=None, **kwargs):
     """Displays PNG/JPEG files or image data etc, `kwrags` are passed to IPython.display.Image. 
     `crop` is a tuple of (left, top, right, bottom) in percentage of image size to crop the image.
@@ -417,7 +417,7 @@ def _rselove_targets(applyto):
             raise ValueError(f"No slides selected with applyto={applyto!r}")
         return selected[0], [s._specs for s  in selected] 
 
-@_internal_xmd_call('transition')
+@_internal_xmd_call('transition', volatile=True)
 @slidesready
 def transition(name:str, applyto=None):
     """Set transition animation for the current slide or slides selected by `applyto`. 
@@ -431,7 +431,7 @@ def transition(name:str, applyto=None):
         spec.anim = name
     slide._view_transition()
 
-@_internal_xmd_call('yoffset')    
+@_internal_xmd_call('yoffset', volatile=True)
 @slidesready
 def yoffset(value:int, applyto=None):
     """Set vertical offset for the current slide or slides selected by `applyto`. 
@@ -454,7 +454,7 @@ def yoffset(value:int, applyto=None):
         spec.yoffset = value
     slide._mount_user_css()
 
-@_internal_xmd_call('css')
+@_internal_xmd_call('css', volatile=True)
 @slidesready
 def css(props: dict=None, applyto=None, **css_vars):
     """
@@ -519,7 +519,7 @@ def _crop_svg(node, bbox):
     
     return re.sub(r'viewBox\=[\"\'](.*?)[\"\']', crop_viewbox, node ,1, flags=re.DOTALL)
     
-@_internal_xmd_call('svg')
+@_internal_xmd_call('svg', volatile=True)
 def svg(data=None,width = None,caption=None, crop=None, css_props={}, css_class=None, **kwargs):
     """Display svg file or svg string/bytes with additional customizations. 
     `crop` is a tuple of (left, top, right, bottom) in percentage of image size to crop the image.
@@ -1032,7 +1032,7 @@ def doc(obj,prepend_str = None, members = None, itself = True):
     
     return XTML(_full_doc)
 
-@_internal_xmd_call('today')
+@_internal_xmd_call('today', volatile=True)
 def today(fmt = '%b %d, %Y',fg = 'inherit'): # Should be inherit color for markdown flow
     "Returns today's date in given format."
     return color(datetime.datetime.now().strftime(fmt),fg=fg, bg = None)
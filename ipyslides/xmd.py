@@ -1,7 +1,9 @@
 # This package exports xmd at top level.
 
-import textwrap, sys, string, builtins, inspect, ast
+import textwrap, sys, os, string, builtins, inspect, ast
 import re, secrets # secrets for unique keys
+import hashlib
+from collections import OrderedDict
 from itertools import islice
 from functools import partial
 from contextlib import contextmanager
@@ -18,7 +20,7 @@ from IPython.utils.capture import capture_output, CapturedIO
 from ipywidgets import DOMWidget
 
 from .formatters import (XTML, altformatter, htmlize, get_slides_instance, 
-    frozen, widget_from_data, _highlight, _inline_style, _delim)
+    frozen, widget_from_data, _highlight, _inline_style, _delim, _code_themes)
 from .source import SourceCode
 
 _md_extensions = [
@@ -64,12 +66,17 @@ class Extensions:
 # NEVER allow random functions, only xmd.register is gateway for security,
 # as well as scope, like a function inside python script is not in notebook user namespace to access here
 _XMD_FUNCS = {} # will be populated by decorated functions
+_PATTERN_CACHE = {} # Internal cache to avoid re-compiling regex for every slide/fragment
+_VOLATILE_FUNCS = set() # module functions whose output depends on files, time or slides state, never cached
 
-def _internal_xmd_call(fname, slidebound=False):
-    "Decorator to register a function as an internal xmd function."
+def _internal_xmd_call(fname, slidebound=False, volatile=False):
+    "Decorator to register a function as an internal xmd function. `volatile` functions depend on state outside markdown text."
     def decorator(func):
         nonlocal fname, slidebound
         _XMD_FUNCS[fname] = (func, "slide" if slidebound else "module") # store function and whether it is slidebound
+        _PATTERN_CACHE.pop('xmd-funcs', None) # rebuild legacy func pattern on next use
+        if volatile:
+            _VOLATILE_FUNCS.add(fname)
         return func
     return decorator
 
@@ -120,18 +127,41 @@ def capture_content(stdout: bool = True, stderr: bool = True, display: bool = Tr
     finally: # only need finally, errors are automatically thrown
         builtins.print = bprint
         
+# Compiled patterns used on every markdown chunk, dynamic ones are kept in _PATTERN_CACHE below
+_AT_KEYS_RE = re.compile(r'''
+    (?<!\\) # negative lookbehind: don't match if there's a backslash
+    (?<!\w) # Don't match if a word before so example@google.com is safe
+    (?<!\`) # Don't match keys inside backticks
+    @(?:[A-Za-z_]\w*!?)(?:\s*,\s*@(?:[A-Za-z_]\w*!?))*   # @key, @key2!, @key3 (single or comma-separated)
+''', re.VERBOSE)
+_LEGACY_CITE_RE = re.compile(r"(?<![\`\.])\bcite\`(.*?)\`;?", flags=re.DOTALL)
+_INCLUDE_RE = re.compile(r"^(\s*)include\`(.*?)\`", flags=re.DOTALL | re.MULTILINE)
+_INCLUDE_RANGE_RE = re.compile(r'\[(.*?)\]$')
+_PTAGS_RE = re.compile(r"^<p>\s*|\s*</p>$")
+_FENCE_RE = re.compile(r'^```', flags=re.MULTILINE)
+_PARAM_RE = re.compile(
+    r'(?:([\w\-.]+)=)?'
+    r'("([^"]*)"|\'([^\']*)\'|([\S]+))'
+)
+_NUMBER_RE = re.compile(r'^\d+(\.\d+)?$')
+_NESTED_RES = [re.compile(rf"\`{'/'*depth}(.*?){'/'*depth}\`", flags=re.DOTALL | re.MULTILINE) for depth in range(4,1,-1)] # `////, `///, `//
+_LINK_TARGET_RE = re.compile(r"(?<![\`\\])\[\#([\w\-]+)/\](?!\S)")
+_LEGACY_ORIGIN_RE = re.compile(r"<link:([\w\d-]+):origin\s*(.*?)>")
+_LEGACY_TARGET_RE = re.compile(r"<link:([\w\d-]+):target\s*(.*?)>")
+_LEGACY_MDVAR_RE = re.compile(r"(?<![\`\\])\<md-([\w]+)/\>")
+_MDVAR_RE = re.compile(r"(?<![\`\\])\[md-([\w]+)/\](?!\S)")
+_DISPLAYVAR_RE = re.compile(r'DISPLAYVAR(\d+)DISPLAYVAR')
+_PRIVATE_VAR_RE = re.compile(r"PrivateXmdVar(\d+)X")
+_VAR_RE = re.compile(r"%\{([^{]*?)\}", flags=re.DOTALL)
+_MATCHED_VAR_RE = re.compile(r"([\\]*?)%\{\s*([a-zA-Z_][\w\d_]*)(.*?)\s*\}", flags=re.DOTALL) # avoid \%{ escape, [\w\d_]* to allow single letter
+_LEGACY_SUPSUB_RE = re.compile(r'(?: )?([\^\_])\`([^\`]*?)\`') # leading space for readability consumed
+_EOF_RE = re.compile(r'^\s*EOF\s*$', flags=re.MULTILINE)
+
 def _resolve_citations(parser, content):
     "Resolve citations and other minimal stuff that can't nest other functions."
     slides = get_slides_instance()
     if not slides or not slides.this: # under building slide
         return content # no need to resolve anything
-
-    AT_KEYS = re.compile(r'''
-        (?<!\\) # negative lookbehind: don't match if there's a backslash
-        (?<!\w) # Don't match if a word before so example@google.com is safe
-        (?<!\`) # Don't match keys inside backticks
-        @(?:[A-Za-z_]\w*!?)(?:\s*,\s*@(?:[A-Za-z_]\w*!?))*   # @key, @key2!, @key3 (single or comma-separated)
-    ''', re.VERBOSE)
     
     def sub_cite(match):
         keys = [k.strip().lstrip('@') for k in match.group().split(',')] # split by comma and remove leading @
@@ -147,11 +177,11 @@ def _resolve_citations(parser, content):
         return res
     
     # replace @key, @key2! etc with citation output
-    content = AT_KEYS.sub(sub_cite, content)  
+    content = _AT_KEYS_RE.sub(sub_cite, content)  
     # warn for cite`*keys` usage
-    content = re.sub(r"(?<![\`\.])\bcite\`(.*?)\`;?", 
+    content = _LEGACY_CITE_RE.sub(
         lambda m: error('SyntaxError',f'Use @key, @key2!, @key3 etc. {m.group()} syntax is deprecated.').value, 
-        content, flags=re.DOTALL) 
+        content) 
     return content
 
 
@@ -220,20 +250,27 @@ del TagFixer
 class char_esc:
     r"""Utility class for escaping and restoring special characters using backslash in text."""
     _chars = r"`@%|/<>:;!.,+-" # Characters to escape
+    # (escaped, token) pairs, only those present in text are replaced, which is faster than a callback per match
+    _pairs = tuple((f"\\{ch}", f"ESC-{ord(ch):03}-CHR") for ch in _chars)
 
     @classmethod
     def escape(cls, text):
         """Escape characters by replacing with tokens."""
-        for ch in cls._chars:
-            text = text.replace(rf"\{ch}", f"ESC-{ord(ch):03}-CHR")
+        if '\\' not in text:
+            return text
+        for ch, token in cls._pairs:
+            if ch in text:
+                text = text.replace(ch, token)
         return text
 
     @classmethod
     def restore(cls, text, ascii_backtick=False):
         """Restore escaped tokens back to original characters. ` -> &#96; if ascii_backtick is False (default)."""
-        for ch in cls._chars:
-            repl = r"&#96;" if ch == '`' and not ascii_backtick else ch
-            text = text.replace(f"ESC-{ord(ch):03}-CHR", repl)
+        if 'ESC-' not in text:
+            return text
+        for ch, token in cls._pairs:
+            if token in text:
+                text = text.replace(token, r"&#96;" if ch == '\\`' and not ascii_backtick else ch[1])
         return text
     
 class esc:
@@ -268,49 +305,64 @@ def load(filepath : str, start:int=None, end=None):
     # except Exception as e:
     #     return error('Exception', f'Could not include file or markdown snippet {filepath!r}:\n{e}').value
 
-# This shoul be outside, as needed in other modules
-def resolve_included_files(text_chunk):
-    "Markdown files added by include`file.md[start:end]` should be inserted as plain."
-    all_matches = re.findall(r"^(\s*)include\`(.*?)\`", text_chunk, flags=re.DOTALL | re.MULTILINE)
-    for indent, match in all_matches:
-        # Parse match into file path and range
-        range_match = re.search(r'\[(.*?)\]$', match)
-        if range_match:
-            filepath = match[:range_match.start()].strip()
-            range_str = range_match.group(1).strip()
-            
-            start, end = None, None
-            try:
-                if ':' in range_str:
-                    start_str, end_str = range_str.split(':', 1)
-                    start = int(start_str.strip()) - 1 if start_str.strip() else None
-                    end = int(end_str.strip()) if end_str.strip() else None
-                elif range_str: # single line number
-                    start = int(range_str) - 1
-                    end = start + 1
-            except (ValueError, IndexError):
-                # Invalid range, treat whole match as filename
-                filepath = match
+_INCLUDE_CACHE = {} # absolute path -> (mtime_ns, size, lines), files are re-read only when changed on disk
+
+def _parse_include(spec):
+    "Split include`file.md[start:end]` spec into file path and 0-based slice bounds."
+    if range_match := _INCLUDE_RANGE_RE.search(spec):
+        range_str = range_match.group(1).strip()
+        try:
+            if ':' in range_str:
+                start_str, end_str = range_str.split(':', 1)
+                start = int(start_str.strip()) - 1 if start_str.strip() else None
+                end = int(end_str.strip()) if end_str.strip() else None
+            elif range_str: # single line number
+                start = int(range_str) - 1
+                end = start + 1
+            else:
                 start, end = None, None
-        else:
-            filepath = match
-            start, end = None, None
+            return spec[:range_match.start()].strip(), start, end
+        except (ValueError, IndexError):
+            pass # Invalid range, treat whole spec as filename
+    return spec, None, None
+
+def _include_lines(filepath):
+    "Lines of an included file, cached by path, modification time and size."
+    st = os.stat(filepath)
+    cached = _INCLUDE_CACHE.get(path := os.path.abspath(filepath))
+    if cached is None or cached[:2] != (st.st_mtime_ns, st.st_size):
+        with open(filepath, "r", encoding="utf-8") as f:
+            cached = _INCLUDE_CACHE[path] = (st.st_mtime_ns, st.st_size, tuple(f.readlines()))
+    return cached[2]
 
+# This shoul be outside, as needed in other modules
+def resolve_included_files(text_chunk, graph=None):
+    """Markdown files added by include`file.md[start:end]` should be inserted as plain.
+    If a dict is given as `graph`, absolute paths of included files are added to it with their line ranges,
+    even if reading them fails, so they can be watched for changes."""
+    def insert(match):
+        indent, spec = match.groups()
+        filepath, start, end = _parse_include(spec)
+        if graph is not None:
+            graph.setdefault(os.path.abspath(filepath), []).append((start, end))
         try:
-            with open(filepath, "r", encoding="utf-8") as f:
-                lines = f.readlines()[slice(start,end)]
-                text = textwrap.indent("\n" + "".join(lines) + "\n", indent) # need inside ::: blocks
-                text_chunk = text_chunk.replace(f"include`{match}`", text, 1)
+            lines = _include_lines(filepath)[slice(start,end)]
+            return indent + textwrap.indent("\n" + "".join(lines) + "\n", indent) # need inside ::: blocks
         except Exception as e:
-            err_msg = error('Exception', f'Could not include file or markdown snippet {filepath!r}:\n{e}').value
-            text_chunk = text_chunk.replace(f"include`{match}`", err_msg, 1)
-
-    return text_chunk
+            return indent + error('Exception', f'Could not include file or markdown snippet {filepath!r}:\n{e}').value
+    
+    if 'include`' not in text_chunk:
+        return text_chunk
+    return _INCLUDE_RE.sub(insert, text_chunk)
 
 _extensions = Extensions() # Global instance of Extensions, don't delete class Extensions still
 
-# Internal cache to avoid re-compiling regex for every slide/fragment
-_PATTERN_CACHE = {}
+def _func_re():
+    "Compiled pattern for legacy func`...` calls, rebuilt only when registered functions change."
+    if 'xmd-funcs' not in _PATTERN_CACHE:
+        all_func = '|'.join(map(re.escape, _XMD_FUNCS)) # escape ^ and _ for regex, as they are special characters
+        _PATTERN_CACHE['xmd-funcs'] = re.compile(rf"(?<![\`\.])\b({all_func})(\[.*?\])?\`([^\`]*)\`", flags=re.DOTALL | re.MULTILINE)
+    return _PATTERN_CACHE['xmd-funcs']
 
 class cmnt_esc:
     "Important to escape HTML comment to avoid parsing syntax inside it"
@@ -349,21 +401,72 @@ _PLUS_RE = re.compile(r'^\+\+(?:\[(?P<opt>[^\]\n]+)\])?(?:\s*$|\s)', re.MULTILIN
 # Count only standalone ".." tokens (surrounded by whitespace or string boundaries)
 DOTS_RE = re.compile(r'(?<!\S)\.\.(?!\S)')
 
-MACRO_RE = re.compile(
-    r"(?<![\\\`])"            # not preceded by backslash or backtick
-    r"\[([a-zA-Z_]\w*)(!{1,2})(?![!])\s*"         # [name! / [name!! but not more !, with optional spaces, must not start with a digit
-    r"((?:(?!\[[a-zA-Z_]\w*!)[\s\S])*?)"  # body; stop before a nested macro opener
-    r"\s*/\]",            # closing /] must stay free so sub/sup before text can stay closer
-    flags = re.DOTALL | re.MULTILINE
+# Openers and closers of [name! body /] calls, scanned once and matched with a stack, innermost calls resolve first
+# Preceding backslash or backtick of an opener is checked in scan, a lookbehind here would be tried at every position
+MACRO_TOKEN_RE = re.compile(
+    r"\[(?P<name>[a-zA-Z_]\w*)(?P<bangs>!{1,2})(?![!])\s*" # [name! / [name!! but not more !, with optional spaces, must not start with a digit
+    r"|/\]",            # closing /] must stay free so sub/sup before text can stay closer, spaces before it are stripped from body
 )
+_MACRO_ESCAPES = "\\`"
+_MACRO_MAX_DEPTH = 16
+
+class _MacroMatch(tuple):
+    "Match-like (source, name, bangs, body) of a [name! body /] call, consumed by XMarkdown.repl_py_func."
+    def group(self, index=0): return self[index]
+    def groups(self): return self[1:]
+
+# Content-addressed cache of converted markdown parts, keeps last _PARSE_CACHE_SIZE parts (LRU)
+_PARSE_CACHE = OrderedDict()
+_PARSE_CACHE_SIZE = 512
+# Parts with these can have side effects (citations, includes, md-vars) or depend on more than text, never cached
+# private variables of nested calls are numbered per parse, so text holding them is not addressable by content
+_NOCACHE_RE = re.compile(r"include\`|cite\`|\[\^|md-|\`/{2,}|<link:|\w(?:\[[^\]]*\])?\`|(?<!\w)@[A-Za-z_]|PrivateXmdVar\d+X|DISPLAYVAR")
+_MACRO_NAME_RE = re.compile(r"(?<![\\\`])\[([a-zA-Z_]\w*)!")
+_IMMUTABLE_TYPES = (str, bytes, int, float, complex, bool, type(None))
+
+def _fingerprint(value):
+    "Hash of an immutable value (recursively for tuples/frozensets), None if value can change in place."
+    if isinstance(value, _IMMUTABLE_TYPES):
+        return hash((type(value), value)) # type included as 1, 1.0 and True format differently
+    if isinstance(value, (tuple, frozenset)):
+        items = [_fingerprint(v) for v in value]
+        if any(item is None for item in items):
+            return None
+        return hash((type(value), *(sorted(items) if isinstance(value, frozenset) else items)))
+    return None
+
+def _content_key(text, user_ns=get_main_ns):
+    """Key of raw markdown by its text and immutable variables it uses, None if its conversion depends on more than that,
+    like volatile functions, side effects or variables which can change in place. `user_ns` is called only if variables are used."""
+    if _NOCACHE_RE.search(text):
+        return None
+    
+    for name in _MACRO_NAME_RE.findall(text):
+        if name in _VOLATILE_FUNCS or _XMD_FUNCS.get(name, (None, "module"))[1] != "module":
+            return None # slide/user functions may have side effects
+    
+    fps = []
+    if (keys := _matched_vars(text)):
+        ns = user_ns()
+        for key in keys:
+            if key in esc._store or key not in ns:
+                return None # escaped variables are used once, missing ones show context dependent error
+            if (fp := _fingerprint(ns[key])) is None:
+                return None
+            fps.append((key, fp))
+    
+    # comment tokens are random per call, so use comments themselves to address content
+    text = cmnt_esc._TOKEN_RE.sub(lambda m: cmnt_esc._store.get(m.group(), m.group()), text)
+    return (hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest(), tuple(fps))
 
 def strip_ptags(content):
     "Strip <p> and </p> tags from the start and end of the content, if present."
-    return re.sub(r"^<p>\s*|\s*</p>$", "", content) # clean up internal spaces as well, but no stripping outside if no p tags
+    return _PTAGS_RE.sub("", content) # clean up internal spaces as well, but no stripping outside if no p tags
 
 class XMarkdown(Markdown):
     def __init__(self):
         super().__init__(**_extensions.active)
+        self._cache_ns = repr(sorted(map(repr, _extensions.active.values()))) # parts converted by other extensions should not share cache
         self._vars = {}
         self._returns = True
         self._nesting_depth = 0 # checks if using _parse in nested manner
@@ -412,7 +515,7 @@ class XMarkdown(Markdown):
         if xmd[:3] == "```":  # Could be a block just in start but we need newline to split blocks
             xmd = "\n" + xmd
 
-        if len(re.findall(r'^```', xmd, flags = re.MULTILINE)) % 2:
+        if len(_FENCE_RE.findall(xmd)) % 2:
             issue = error("ValueError",f"Some blocks started with ```, but never closed, in markdown:\n{xmd}")
             return issue.value if returns else display(issue) # return value or display
         
@@ -434,7 +537,7 @@ class XMarkdown(Markdown):
                     outputs.append(part) # Delimiter
                     continue
                 
-                out = self.convert(part) 
+                out = self._convert_part(part) 
                 if isinstance(out, list):
                     outputs.extend(out)
                 elif out: # Some syntax like section on its own line can leave empty block after conversion
@@ -460,6 +563,31 @@ class XMarkdown(Markdown):
         else:
             return display(*outputs)
         
+    def _cache_key(self, text):
+        "Key of a raw markdown part for parse cache, None if its conversion depends on more than text and immutable variables."
+        if (key := _content_key(text, self.user_ns)) is not None:
+            return (*key, self._cache_ns, _code_themes.inline) # code blocks style differs in slides
+    
+    def _convert_part(self, text):
+        "Convert a raw markdown part, reusing converted html of an unchanged part from content-addressed cache."
+        key = self._cache_key(text)
+        if key is not None and key in _PARSE_CACHE:
+            _PARSE_CACHE.move_to_end(key)
+            cmnt_esc.restore(text) # release masked comments of this part as convert would do
+            out, themes = _PARSE_CACHE[key]
+            if themes:
+                _code_themes.register(*themes) # code blocks styles for slide being built
+            return out
+        
+        nvars, nthemes = len(self._vars), len(_code_themes._log)
+        out = self.convert(text)
+        if key is not None and isinstance(out, str) and not any(
+            k.startswith('DISPLAYVAR') for k in islice(self._vars, nvars, None)): # rich objects are not reusable
+            _PARSE_CACHE[key] = (out, tuple(_code_themes._log[nthemes:]))
+            if len(_PARSE_CACHE) > _PARSE_CACHE_SIZE:
+                _PARSE_CACHE.popitem(last=False)
+        return out
+        
     def _load_files(self, content):
         # Parse stuff here
         # Nested loading should be avoided, but move it inside so user know which included file has nested load inside
@@ -500,13 +628,9 @@ class XMarkdown(Markdown):
     
     def _parse_params(self, param_string):
         """Parse parameter string with simple regex."""
-        RE_PARAM = re.compile(
-            r'(?:([\w\-.]+)=)?'
-            r'("([^"]*)"|\'([^\']*)\'|([\S]+))'
-        )
         numbers, args, kwargs, node_attrs = [], [], {}, {}
         post_slash = False # *widths *classes **props / **attrs
-        for match in RE_PARAM.finditer(param_string.lstrip(': ')): # remove leading : and space
+        for match in _PARAM_RE.finditer(param_string.lstrip(': ')): # remove leading : and space
             # The value is captured in one of three groups
             value = match.group(3) or match.group(4) or match.group(5)
             if value == "/": 
@@ -520,7 +644,7 @@ class XMarkdown(Markdown):
                 else:
                     kwargs[key] = value
             else:
-                if value.isdigit() or re.match(r'^\d+(\.\d+)?$', value):
+                if value.isdigit() or _NUMBER_RE.match(value):
                     numbers.append(float(value) if '.' in value else int(value))
                 else:
                     value = (value.replace('.',' ') if args else value).strip() # remove . from classes except from directive name
@@ -624,9 +748,9 @@ class XMarkdown(Markdown):
             return f'`{self._parse_nested(m.group(1), returns = True, tag="")}`' # bare content
 
         # match neseted `// //` upto many levels, will be deprecated
-        for depth in range(4,1,-1): # `////, `///, `// at least two slashes
-            op, cl = '/'*depth, '/'*depth
-            text_chunk = re.sub(rf"\`{op}(.*?){cl}\`", repl, text_chunk, flags=re.DOTALL | re.MULTILINE)
+        if '`//' in text_chunk: # at least two slashes
+            for pattern in _NESTED_RES:
+                text_chunk = pattern.sub(repl, text_chunk)
         
         if has_syntax:
             text_chunk = self._handle_var(error("SyntaxError",
@@ -898,11 +1022,12 @@ class XMarkdown(Markdown):
         text = self._resolve_md_vars(text)  # Resolve [md-var/] variables stored during md-var blocks
         text = self._resolve_nested(text)  # To be deprecated, but still supported for backward compatibility
         # Reolve link targets as invisible span with id
-        text = re.sub(r"(?<![\`\\])\[\#([\w\-]+)/\](?!\S)", r"<span id='\1' class='slide-link-target'></span>", text)
+        text = _LINK_TARGET_RE.sub(r"<span id='\1' class='slide-link-target'></span>", text)
         # Resolve (deprecated) <link:label:origin text> and <link:label:target text?>
-        warning = warn(r'The `<link: ...>` syntax is deprecated. Use `link` function instead.', 'SyntaxWarning')
-        text = re.sub(r"<link:([\w\d-]+):origin\s*(.*?)>", rf"<a href='#target-\1' id='origin-\1' class='slide-link'>\2</a>{warning}", text)
-        text = re.sub(r"<link:([\w\d-]+):target\s*(.*?)>", rf"<a href='#origin-\1' id='target-\1' class='slide-link'>\2</a>{warning}", text)
+        if '<link:' in text:
+            warning = warn(r'The `<link: ...>` syntax is deprecated. Use `link` function instead.', 'SyntaxWarning')
+            text = _LEGACY_ORIGIN_RE.sub(rf"<a href='#target-\1' id='origin-\1' class='slide-link'>\2</a>{warning}", text)
+            text = _LEGACY_TARGET_RE.sub(rf"<a href='#origin-\1' id='target-\1' class='slide-link'>\2</a>{warning}", text)
         # Resolve citations before variable substitution to avoid conflicts with citation keys
         text = _resolve_citations(self, text)  
         
@@ -915,11 +1040,13 @@ class XMarkdown(Markdown):
     def _resolve_md_vars(self, text):
         # Replace [md-var/] variables stored during md-var blocks, 
         # but reusing snippets expose internal state, AVOID THAT
+        if 'md-' not in text:
+            return text
+        
         warning = warn(r'The `<md-var/>` syntax is deprecated. Use `[md-var/]` instead.', 'SyntaxWarning')
-        text = re.sub(r"(?<![\`\\])\<md-([\w]+)/\>", rf"{warning} [md-\1/]", text) # update legacy to new syntax
+        text = _LEGACY_MDVAR_RE.sub(rf"{warning} [md-\1/]", text) # update legacy to new syntax
         
-        all_matches = re.findall(r"(?<![\`\\])\[md-([\w]+)/\](?!\S)", text) # avoid `\ and end must
-        for match in all_matches:
+        for match in _MDVAR_RE.findall(text): # avoid `\ and end must
             value = esc._store.pop(match, error('NameError', f'Markdown variable {match!r} is not defined or already used!'))
             text = text.replace(f"[md-{match}/]", self._handle_var(value, f'::: md-{match}'), 1)
         return text
@@ -934,10 +1061,9 @@ class XMarkdown(Markdown):
     
     def _resolve_vars(self, text):
         "Substitute saved variables"
-        if re.findall(r'DISPLAYVAR(\d+)DISPLAYVAR', text):
+        if _DISPLAYVAR_RE.search(text):
             if self._returns or getattr(self, '_show_disply_error', False):
-                text = re.sub(
-                    r'DISPLAYVAR(\d+)DISPLAYVAR', 
+                text = _DISPLAYVAR_RE.sub(
                     lambda m: error(
                         'DisplayError',
                         f'{self._var_info(m.group())} cannot be displayed in current context or nesting level '
@@ -959,7 +1085,7 @@ class XMarkdown(Markdown):
                         objs.append(XTML(self._resolve_vars(content)))
                 return objs
 
-        out = re.sub(r"PrivateXmdVar(\d+)X", lambda m: self._vars.get(m.group(), m.group()), text)
+        out = _PRIVATE_VAR_RE.sub(lambda m: self._vars.get(m.group(), m.group()), text)
         return char_esc.restore(cmnt_esc.restore(out)) # restore comments and escaped characters
   
     def _handle_var(self, value, ctx=None): # Put a temporary variable that will be replaced at end of other conversions.
@@ -986,8 +1112,7 @@ class XMarkdown(Markdown):
     def _sub_vars(self, html_output):
         "Substitute variables in html_output given as %{var}."   
         # Check for variables first
-        var_pattern = r"%\{([^{]*?)\}"
-        if re.search(var_pattern, html_output, flags=re.DOTALL):
+        if _VAR_RE.search(html_output):
             user_ns = self.user_ns() # get once, will be called multiple time
             def handle_match(match):
                 key,*_ = _matched_vars(match.group()) 
@@ -1020,14 +1145,13 @@ class XMarkdown(Markdown):
                     return self._handle_var(value,ctx = match.group()) 
                 return self._handle_var(hfmtr.vformat(f"{{{match.group()[2:-1].strip()}}}", (), user_ns)) # clear spaces around variable
 
-            html_output = re.sub(var_pattern, handle_match, html_output, flags=re.DOTALL)
+            html_output = _VAR_RE.sub(handle_match, html_output)
 
         
         # Replace inline functions, keep it nested for accessing inner state
-        all_func = '|'.join(_XMD_FUNCS) # escape ^ and _ for regex, as they are special characters
-        FUNC_RE = rf"(?<![\`\.])\b({all_func})(\[.*?\])?\`([^\`]*)\`"
+        FUNC_RE = _func_re()
         # Check if there is at least one macro format to process
-        if re.search(FUNC_RE, html_output, flags=re.DOTALL | re.MULTILINE):
+        if '`' in html_output and FUNC_RE.search(html_output):
             # Single inline warning in start instead of clutter everywhere
             html_output = self._handle_var(warn(
                 'Legacy syntax for func`...` is being deprecated and will be removed in future releases. '
@@ -1036,25 +1160,51 @@ class XMarkdown(Markdown):
             )) + "\n" + html_output
             
             with self.active_parser(): # set instance parser to pass variables
-                html_output = re.sub(FUNC_RE, self.repl_inline_func, html_output, flags=re.DOTALL | re.MULTILINE)
+                html_output = FUNC_RE.sub(self.repl_inline_func, html_output)
 
         # These will be deprecated in future alongwith bactick functions
-        warning = warn(r'Legacy syntax for superscript ^\`...\` and subscript _\`...\` is being deprecated. Use `sub/sup` functions instead.', "SyntaxWarning")
-        html_output = re.sub(r'(?: )?\^\`([^\`]*?)\`',rf'<sup>\1</sup>{warning}', html_output) # superscript, leading space for readability consumed
-        html_output = re.sub(r'(?: )?\_\`([^\`]*?)\`',rf'<sub>\1</sub>{warning}', html_output) # subscript
+        if '^`' in html_output or '_`' in html_output:
+            warning = warn(r'Legacy syntax for superscript ^\`...\` and subscript _\`...\` is being deprecated. Use `sub/sup` functions instead.', "SyntaxWarning")
+            html_output = _LEGACY_SUPSUB_RE.sub( # superscript/subscript
+                lambda m: f"<{'sup' if m.group(1) == '^' else 'sub'}>{m.group(2)}</{'sup' if m.group(1) == '^' else 'sub'}>{warning}", html_output)
         
         # New style function call [name! content /]
-        # Match only innermost blocks by forbidding nested openers like [other! inside body.
-        with self.active_parser(): # set instance parser to pass variables
-            depth = 0
-            while MACRO_RE.search(html_output):
-                depth += 1
-                html_output = MACRO_RE.sub(self.repl_py_func, html_output)
-                if depth > 16: # prevent infinite loop
+        if '!' in html_output and '/]' in html_output:
+            with self.active_parser(): # set instance parser to pass variables
+                html_output = self._sub_macros(html_output)
+        return html_output 
+    
+    def _sub_macros(self, text):
+        "Resolve [name! body /] calls in a single scan, inner calls are resolved before their parents receive body."
+        if '/]' not in text:
+            return text
+        
+        pieces, opened, pos = [[]], [], 0 # pieces per nesting level, level 0 is top text
+        for m in MACRO_TOKEN_RE.finditer(text):
+            if m.group('name'): # opener
+                if m.start() and text[m.start() - 1] in _MACRO_ESCAPES:
+                    continue # escaped opener stays as text
+                if len(opened) >= _MACRO_MAX_DEPTH:
                     return self._handle_var(error('RecursionError', 
-                        f"Too many nested macros (> 16) in '{html_output}'")
+                        f"Too many nested macros (> {_MACRO_MAX_DEPTH}) in '{text}'")
                     )
-        return html_output 
+                pieces[-1].append(text[pos:m.start()])
+                pieces.append([])
+                opened.append(m)
+            elif opened: # closer of innermost open call
+                pieces[-1].append(text[pos:m.start()])
+                op, body = opened.pop(), ''.join(pieces.pop())
+                source = op.group() + body + m.group()
+                pieces[-1].append(self.repl_py_func(_MacroMatch((source, op.group('name'), op.group('bangs'), body.rstrip()))))
+            else:
+                continue # stray closer stays as text
+            pos = m.end()
+        
+        pieces[-1].append(text[pos:])
+        while opened: # unclosed calls stay as text, their closed inner calls are resolved
+            body = ''.join(pieces.pop())
+            pieces[-1].append(opened.pop().group() + body)
+        return ''.join(pieces[0])
     
     def repl_inline_func(self, m):
         # This will be deprecated
@@ -1150,10 +1300,7 @@ class XMarkdown(Markdown):
 
 def _matched_vars(text):
     matches = [var 
-        for slash, var, _ in re.findall(
-            r"([\\]*?)%\{\s*([a-zA-Z_][\w\d_]*)(.*?)\s*\}", # avoid \%{ escape, [\w\d_]* means zero or more word, to allow single letter
-            text, flags = re.DOTALL,
-        ) if not slash
+        for slash, var, _ in _MATCHED_VAR_RE.findall(text) if not slash
     ]
     return tuple(matches)  
 
@@ -1342,6 +1489,8 @@ class _XMDMeta(type):
             if not callable(func):
                 raise TypeError(f"Expected a callable function, got {type(func)}")
             _XMD_FUNCS[name] = (func, "user")
+            _PATTERN_CACHE.pop('xmd-funcs', None) # rebuild legacy func pattern on next use
+            _PARSE_CACHE.clear() # name may have been rendered as html tag before
             return func
         
         if func is not None:
@@ -1408,7 +1557,7 @@ def _stream_chunks(text, sep='---'):
         # Group 1: Shield (3+ backticks) | Group 2: Cut (Separator)
         _PATTERN_CACHE[s] = re.compile(rf"(?m)(^`{{3}})|(^{re.escape(s)}\s*$)")
 
-    if eof := re.search(r'^\s*EOF\s*$',text, flags = re.MULTILINE):
+    if eof := _EOF_RE.search(text):
         text = text[:eof.start()]  # truncate at EOF
 
     text = textwrap.dedent(text)  # content coming from python functions is usually indented, fix for all cases, need sep at start
@@ -0,0 +1,34 @@
+import os
+import pytest
+
+
+@pytest.fixture(scope = 'session')
+def slides(tmp_path_factory):
+    "Slides in a notebook-like shell, with notebook directory in a temporary folder."
+    os.chdir(tmp_path_factory.mktemp('notebook'))
+    from IPython.core.interactiveshell import InteractiveShell
+    InteractiveShell.instance().kernel = None # Slides need a kernel to run in notebook
+    
+    import ipyslides as isd
+    return isd.Slides()
+
+
+@pytest.fixture
+def deck(slides):
+    "Slides with only title slide left from previous tests."
+    slides.clear(1)
+    slides._synced_slides = []
+    yield slides
+    slides.clear(1)
+    slides._synced_slides = []
+
+
+@pytest.fixture
+def build(deck):
+    "Builds slide number from markdown source."
+    from ipyslides._base.slide import _build_slide
+    def build(number, source):
+        with _build_slide(deck, number) as slide:
+            deck.src(source)
+        return slide
+    return build
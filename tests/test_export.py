@@ -0,0 +1,88 @@
+import re, json, gzip, base64, tracemalloc
+from pathlib import Path
+
+import pytest
+
+
+@pytest.fixture
+def write(deck):
+    "Builds slide number with given objects written on it."
+    from ipyslides._base.slide import _build_slide
+    def write(number, *objs):
+        with _build_slide(deck, number) as slide:
+            deck.write(*objs)
+        return slide
+    return write
+
+def export(deck, path, **kwargs):
+    deck.export_html(path, overwrite = True, **kwargs)
+    return Path(path).read_text(encoding = 'utf-8')
+
+
+def test_export_reuses_sections(deck, build):
+    for n in range(1, 4):
+        build(n, f"# Slide {n}\nText of slide {n}")
+    first = export(deck, 'reuse.html')
+    assert export(deck, 'reuse.html') == first
+    assert any(Path('.reuse-sections').iterdir()) # sections kept on disk for next export
+
+    build(2, "# Slide 2\nEdited text")
+    edited = export(deck, 'reuse.html')
+    assert 'Edited text' in edited and 'Text of slide 2' not in edited
+    assert 'Text of slide 1' in edited and 'Text of slide 3' in edited
+
+def test_export_lazy(deck, build):
+    build(1, "# Lazy\nLazy content")
+    html = export(deck, 'lazy.html', lazy = True)
+    assert 'class="ips-lazy"><template>' in html
+    assert re.search(r'<template>.*Lazy content.*</template>', html, re.DOTALL)
+
+def test_export_compress(deck, build):
+    build(1, "# Packed\nPacked content")
+    html = export(deck, 'packed.html', compress = True)
+    assert 'Packed content' not in html
+    payload = re.search(r'<script type="application/gzip" id="ips-sections">([^<]+)</script>', html).group(1)
+    bodies = json.loads(gzip.decompress(base64.b64decode(payload)))
+    assert any('Packed content' in body for body in bodies.values())
+    for sec_id in bodies:
+        assert f'id="{sec_id}"' in html # placeholders to fill
+
+def test_export_offline(deck, build):
+    from ipyslides.utils import get_child_dir
+    from ipyslides._base.export_template import vendor_files
+    cache = get_child_dir('.ipyslides-assets', 'vendor', create = True)
+    for name in vendor_files: # no network in tests
+        (cache / name).parent.mkdir(parents = True, exist_ok = True)
+        (cache / name).write_text(f'/* {name} */')
+
+    build(1, "# Offline")
+    html = export(deck, 'offline.html', offline = True)
+    assert 'vendor/require.min.js' in html and 'cdnjs' not in html
+    for name in vendor_files:
+        assert Path('vendor', name).read_text() == f'/* {name} */'
+
+def test_export_static_math(deck, build):
+    pytest.importorskip('latex2mathml')
+    build(1, r"# Math" "\nEquation $x^2$ here and $$\\frac{a}{b}$$")
+    html = export(deck, 'math.html', static_math = True)
+    assert html.count('<math') == 2 and 'x^2' not in html
+
+def test_export_memory_bound(deck, write):
+    nslides, size = 30, 500_000
+    for n in range(1, nslides + 1):
+        write(n, deck.html('pre', f'{n:03}' * (size // 3)))
+
+    exporter = deck.export_html.__self__
+    for _ in range(2): # first export and reuse from disk
+        tracemalloc.start()
+        try:
+            html = Path('memory.html')
+            deck.export_html(str(html), overwrite = True)
+            after, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        assert html.stat().st_size > nslides * size
+        assert peak < 12 * size # transient copies of a section at a time, not whole deck
+        assert after < size # nothing of sections is held after export
+        assert len(repr(exporter._cached)) < 500 * nslides # only keys and digests are kept
@@ -0,0 +1,46 @@
+def numbered(deck):
+    "Slide objects by their numbers, checked against their widget classes."
+    for n, s in deck._slides_dict.items():
+        assert s.number == n and f"n{n}" in s._widget._dom_classes
+    return dict(deck._slides_dict)
+
+
+def test_unchanged_slides_kept(deck):
+    deck._exec_synced_src("# A\n---\n# B\n---\n# C")
+    a, b, c = deck._synced_slides
+    builds = [s._build for s in (a, b, c)]
+
+    deck._exec_synced_src("# A\n---\n# B edited\n---\n# C")
+    assert deck._synced_slides == [a, b, c]
+    assert [a._build, c._build] == [builds[0], builds[2]] # not rebuilt
+    assert b._build != builds[1]
+
+def test_removed_chunk_renumbers(deck):
+    deck._exec_synced_src("# A\n---\n# B\n---\n# C\n---\n# D")
+    a, b, c, d = deck._synced_slides
+    builds = c._build, d._build
+
+    deck._exec_synced_src("# A\n---\n# C\n---\n# D")
+    assert deck._synced_slides == [a, c, d]
+    assert numbered(deck) == {0: a, 1: c, 2: d}
+    assert (c._build, d._build) == builds # moved, not rebuilt
+    assert b._contents == [] # leftover is cleared
+
+def test_inserted_chunk_renumbers(deck):
+    deck._exec_synced_src("# A\n---\n# B\n---\n# C")
+    a, b, c = deck._synced_slides
+
+    deck._exec_synced_src("# A\n---\n# New\n---\n# B\n---\n# C")
+    new = deck._synced_slides[1]
+    assert new not in (a, b, c)
+    assert numbered(deck) == {0: a, 1: new, 2: b, 3: c}
+    assert [s.index for s in deck._synced_slides] == [0, 1, 2, 3]
+
+def test_swapped_chunks(deck):
+    deck._exec_synced_src("# A\n---\n# B\n---\n# C")
+    a, b, c = deck._synced_slides
+
+    deck._exec_synced_src("# A\n---\n# C\n---\n# B")
+    assert numbered(deck) == dict(enumerate(deck._synced_slides))
+    assert set(deck._synced_slides) == {a, b, c} # changed chunk reuses widget of spare slide
+    assert ['# A', '# C', '# B'] == [s._markdown.strip() for s in deck._synced_slides]
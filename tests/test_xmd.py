@@ -0,0 +1,132 @@
+import os, re
+import pytest
+
+
+# Previous implementations, outputs of current ones should be same
+OLD_MACRO_RE = re.compile(
+    r"(?<![\\\`])"
+    r"\[([a-zA-Z_]\w*)(!{1,2})(?![!])\s*"
+    r"((?:(?!\[[a-zA-Z_]\w*!)[\s\S])*?)"
+    r"\s*/\]",
+    flags = re.DOTALL | re.MULTILINE
+)
+
+def old_sub_macros(parser, text):
+    depth = 0
+    while OLD_MACRO_RE.search(text):
+        depth += 1
+        text = OLD_MACRO_RE.sub(parser.repl_py_func, text)
+        if depth > 16:
+            return 'RecursionError'
+    return text
+
+def old_escape(text):
+    for ch in r"`@%|/<>:;!.,+-":
+        text = text.replace(rf"\{ch}", f"ESC-{ord(ch):03}-CHR")
+    return text
+
+def old_restore(text, ascii_backtick=False):
+    for ch in r"`@%|/<>:;!.,+-":
+        text = text.replace(f"ESC-{ord(ch):03}-CHR", r"&#96;" if ch == '`' and not ascii_backtick else ch)
+    return text
+
+
+def html_of(slide):
+    return ''.join(out.data.get('text/html', '') for out in slide._contents)
+
+@pytest.fixture
+def parser(slides):
+    from ipyslides.xmd import XMarkdown
+    parser = XMarkdown()
+    with parser.active_parser():
+        yield parser
+
+def resolved(parser, func, text):
+    "Output of func with private variables replaced by their values, which are numbered differently by both implementations."
+    from ipyslides.xmd import _PRIVATE_VAR_RE
+    parser._vars.clear()
+    out = func(text)
+    while _PRIVATE_VAR_RE.search(out):
+        out = _PRIVATE_VAR_RE.sub(lambda m: parser._vars[m.group()], out)
+    parser._vars.clear()
+    return out
+
+
+@pytest.mark.parametrize('text', [
+    "[b! bold /] and [i! italic /]",
+    "[div! [span! [b! [i! deep /] /] /] .. style='padding:4px' /]",
+    "[span!! style='color:red' .. text   \n  /]",
+    "[b!\n  multi\n  line\n   /]",
+    r"\[b! escaped /] and `[b! in code /]` and [b! real /]",
+    "[b! a /] /] stray closer",
+    "[i! unclosed [b! inner /] tail",
+    "[b!!! three bangs /] [1b! digit /] [b!/] [b! .. /]",
+    "[b! x .. y .. z /]",
+    "x[sub! 2 /] and H[sup!2/]O",
+    "plain text without calls",
+])
+def test_sub_macros_matches_old(parser, text):
+    assert resolved(parser, parser._sub_macros, text) == resolved(parser, lambda t: old_sub_macros(parser, t), text)
+
+def test_sub_macros_depth(parser):
+    text = "[b! " * 17 + "deep" + " /]" * 17
+    assert 'RecursionError' in resolved(parser, parser._sub_macros, text)
+    assert 'RecursionError' not in resolved(parser, parser._sub_macros, "[b! " * 16 + "deep" + " /]" * 16)
+
+
+@pytest.mark.parametrize('text', [
+    r"\@cite \%{var} \[b! not a call /\] path\/to\/file, 5 \+ 3 \- 1 \| x \< y \> z \: \; \! \. \,",
+    r"\`code\` and \\` double and trailing \\",
+    r"no escapes at all",
+    r"ESC-999-CHR is not a token, ESC-064-CHR is",
+])
+def test_char_esc_matches_old(text):
+    from ipyslides.xmd import char_esc
+    assert char_esc.escape(text) == old_escape(text)
+    escaped = old_escape(text)
+    for ascii_backtick in (False, True):
+        assert char_esc.restore(escaped, ascii_backtick) == old_restore(escaped, ascii_backtick)
+
+
+def test_nested_calls_not_reused_across_parses(parser):
+    from ipyslides.xmd import XMarkdown
+    xmd = XMarkdown()
+    assert 'alpha' in xmd._parse('[div! [b! [i! alpha /] /] /]', returns=True)
+    out = xmd._parse('[div! [b! [i! omega /] /] /]', returns=True)
+    assert 'omega' in out and 'alpha' not in out
+
+
+@pytest.mark.parametrize('text', [
+    "[today! /]", "[code! print(1) /]", "include`file.md`", "[^1] footnote", "cite`key`",
+    "PrivateXmdVar0X", "DISPLAYVAR1DISPLAYVAR",
+])
+def test_content_key_bypass(slides, text):
+    from ipyslides.xmd import _content_key
+    assert _content_key(text, dict) is None
+
+def test_content_key_by_variables(slides):
+    from ipyslides.xmd import _content_key
+    assert _content_key("# Title [b! text /]", dict) == _content_key("# Title [b! text /]", dict)
+    assert _content_key("%{x}", lambda: {'x': 1}) != _content_key("%{x}", lambda: {'x': 2})
+    assert _content_key("%{x}", lambda: {'x': [1]}) is None # mutable in place
+    assert _content_key("%{x}", dict) is None # missing shows error in context
+
+def test_parse_cache_follows_variables(build):
+    from ipyslides.xmd import get_main_ns
+    get_main_ns()['cached_var'] = 'first value'
+    assert 'first value' in html_of(build(1, "Value: %{cached_var}"))
+    get_main_ns()['cached_var'] = 'second value'
+    assert 'second value' in html_of(build(1, "Value: %{cached_var}"))
+
+def test_included_file_edits(deck):
+    with open('included.md', 'w') as f:
+        f.write('first content')
+    deck._exec_synced_src("# Title\n---\ninclude`included.md`")
+    assert 'first content' in html_of(deck[1])
+
+    with open('included.md', 'w') as f:
+        f.write('second content')
+    mtime = os.path.getmtime('included.md') + 10 # file systems with coarse mtime
+    os.utime('included.md', (mtime, mtime))
+    deck._exec_synced_src("# Title\n---\ninclude`included.md`")
+    assert 'second content' in html_of(deck[1])